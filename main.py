@@ -9,6 +9,7 @@ Executes the multi-agent LangGraph pipeline for content generation.
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from src.orchestrator import AgentOrchestrator
@@ -94,8 +95,7 @@ def main():
     
     print("\nAgent execution order based on DAG dependencies:")
     print("  parser (no deps) → runs first")
-    print("  questions, product, comparison (dep: parser) → run after parser")
-    print("  faq (deps: parser, questions) → runs after questions")
+    print("  questions + faq, product, comparison (dep: parser) → run after parser")
     
     # Run the DAG execution
     print("\n" + "-" * 60)
@@ -141,15 +141,22 @@ def main():
     print(f"Saving outputs to: {args.output_dir}")
     print("-" * 60)
     
+    outputs = [
+        (results["faq"], "faq.json"),
+        (results["product"], "product_page.json"),
+        (results["comparison"], "comparison_page.json")
+    ]
+    
     try:
-        write_json_output(results["faq"], "faq.json", args.output_dir)
-        print("  ✓ faq.json")
-        
-        write_json_output(results["product"], "product_page.json", args.output_dir)
-        print("  ✓ product_page.json")
+        # Independent files: serialize and write them concurrently
+        with ThreadPoolExecutor(max_workers=len(outputs)) as pool:
+            list(pool.map(
+                lambda item: write_json_output(item[0], item[1], args.output_dir),
+                outputs
+            ))
         
-        write_json_output(results["comparison"], "comparison_page.json", args.output_dir)
-        print("  ✓ comparison_page.json")
+        for _, filename in outputs:
+            print(f"  ✓ {filename}")
         
     except Exception as e:
         print(f"\n❌ Error writing outputs: {e}")
@@ -6,7 +6,7 @@ Enables autonomous agent execution with dependency tracking.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List
 
 
 class BaseAgent(ABC):
@@ -28,12 +28,12 @@ class BaseAgent(ABC):
         self.output: Any = None
     
     @abstractmethod
-    def can_execute(self, completed_agents: List[str]) -> bool:
+    def can_execute(self, completed_agents: FrozenSet[str]) -> bool:
         """
         Check if this agent's dependencies are satisfied.
         
         Args:
-            completed_agents: List of agent IDs that have completed execution
+            completed_agents: Set of agent IDs that have completed execution
             
         Returns:
             True if all dependencies are satisfied, False otherwise
@@ -4,11 +4,11 @@ FAQ Agent Module
 Agent responsible for generating FAQ content from product and question data using LLM.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List
 from src.agents.base_agent import BaseAgent
 from src.models.schemas import Product, Question
 from src.templates.template_definitions import FAQTemplate
-from src.llm_client import llm_client
+from src.llm_client import get_llm_client
 
 
 class FAQGenerationAgent(BaseAgent):
@@ -21,19 +21,21 @@ class FAQGenerationAgent(BaseAgent):
         """Initialize the FAQGenerationAgent with agent_id 'faq'."""
         super().__init__(agent_id="faq")
         self.dependencies: List[str] = ["parser", "questions"]
+        # Hashed copy of the dependency list for can_execute
+        self._deps: FrozenSet[str] = frozenset(self.dependencies)
     
-    def can_execute(self, completed_agents: List[str]) -> bool:
+    def can_execute(self, completed_agents: FrozenSet[str]) -> bool:
         """
         Check if this agent can execute.
         Returns True only if all dependencies have completed.
         
         Args:
-            completed_agents: List of agent IDs that have completed execution
+            completed_agents: Set of agent IDs that have completed execution
             
         Returns:
             True if all dependencies are in completed_agents
         """
-        return all(dep in completed_agents for dep in self.dependencies)
+        return self._deps.issubset(completed_agents)
     
     def execute(self, shared_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -60,14 +62,7 @@ Answers should be informative yet concise (2-4 sentences each)."""
         user_prompt = f"""Generate FAQ answers for this product:
 
 Product Data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
+{product.context_block}
 
 Questions to answer:
 {questions_text}
@@ -80,6 +75,7 @@ Return a JSON array with this structure:
 
 Base all answers on the product data provided. Be helpful and accurate. Return ONLY valid JSON."""
         
+        llm_client = get_llm_client()
         faq_items = llm_client.generate_json(system_prompt, user_prompt, max_tokens=2000)
         
         # Use FAQTemplate to build final output
@@ -4,7 +4,7 @@ Parser Agent Module
 Agent responsible for parsing and extracting information from input content.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List
 from src.agents.base_agent import BaseAgent
 from src.models.schemas import Product
 
@@ -20,13 +20,13 @@ class DataParserAgent(BaseAgent):
         super().__init__(agent_id="parser")
         self.dependencies: List[str] = []  # No dependencies, runs first
     
-    def can_execute(self, completed_agents: List[str]) -> bool:
+    def can_execute(self, completed_agents: FrozenSet[str]) -> bool:
         """
         Check if this agent can execute.
         Always returns True as this agent has no dependencies.
         
         Args:
-            completed_agents: List of agent IDs that have completed execution
+            completed_agents: Set of agent IDs that have completed execution
             
         Returns:
             Always True
@@ -52,17 +52,8 @@ class DataParserAgent(BaseAgent):
         
         raw_data = shared_data["raw_input"]
         
-        # Create and validate Product model instance
-        product = Product(
-            name=raw_data.get("name", ""),
-            concentration=raw_data.get("concentration", ""),
-            skin_type=raw_data.get("skin_type", []),
-            key_ingredients=raw_data.get("key_ingredients", []),
-            benefits=raw_data.get("benefits", []),
-            how_to_use=raw_data.get("how_to_use", ""),
-            side_effects=raw_data.get("side_effects", ""),
-            price=raw_data.get("price", "")
-        )
+        # Create and validate Product model instance (external input boundary)
+        product = Product.from_dict(raw_data, validate=True)
         
         self.output = product
         self.mark_complete()
@@ -4,11 +4,59 @@ Product Agent Module
 Agent responsible for generating product page content using LLM.
 """
 
-from typing import Any, Dict, List
+from collections import ChainMap
+from typing import Any, Dict, FrozenSet, List
 from src.agents.base_agent import BaseAgent
-from src.models.schemas import Product
+from src.models.schemas import Product, ProductPageContent
 from src.templates.template_definitions import ProductTemplate
-from src.llm_client import llm_client
+from src.llm_client import get_llm_client
+
+
+# Static prompt text is built once; the constant system prompt leads every
+# request so provider-side prefix caching can reuse it across runs
+SYSTEM_PROMPT = """You are a professional product copywriter for skincare e-commerce.
+Generate compelling, accurate product page content based on provided data.
+Write in a clear, engaging style that informs and persuades customers."""
+
+USER_TEMPLATE = """Create product page content for:
+
+Product Data:
+{context_block}
+
+Generate a JSON object with these fields:
+{{
+  "description": "2-3 sentence compelling product description",
+  "benefits_section": "Formatted benefits text highlighting what it does",
+  "usage_section": "Clear usage instructions with tips",
+  "ingredients_section": "Explanation of key ingredients and their roles",
+  "safety_section": "Safety information and precautions"
+}}
+
+Write naturally, professionally. Base everything on the data provided. Return ONLY valid JSON."""
+
+
+def build_product_page(product: Product, content: ProductPageContent) -> Dict[str, Any]:
+    """
+    Shape generated product page content into the product page.
+    
+    Shared with the product page node in src.graph.workflow.
+    
+    Args:
+        product: Product the content was generated for
+        content: Validated LLM content; omitted fields are None
+        
+    Returns:
+        Structured product page dictionary built using ProductTemplate
+    """
+    # Structure using template, falling back to product data for omitted fields
+    # Generated sections layered over the read-only product view (no field copies)
+    generated = {
+        "description": content.description or f"{product.name} is a premium skincare product.",
+        "benefits": content.benefits_section if isinstance(content.benefits_section, list) else product.benefits,
+        "how_to_use": content.usage_section or product.how_to_use,
+        "side_effects": content.safety_section or product.side_effects
+    }
+    return ProductTemplate.build(ChainMap(generated, product.view))
 
 
 class ProductPageAgent(BaseAgent):
@@ -22,13 +70,13 @@ class ProductPageAgent(BaseAgent):
         super().__init__(agent_id="product")
         self.dependencies: List[str] = ["parser"]
     
-    def can_execute(self, completed_agents: List[str]) -> bool:
+    def can_execute(self, completed_agents: FrozenSet[str]) -> bool:
         """
         Check if this agent can execute.
         Returns True only if the parser agent has completed.
         
         Args:
-            completed_agents: List of agent IDs that have completed execution
+            completed_agents: Set of agent IDs that have completed execution
             
         Returns:
             True if 'parser' is in completed_agents
@@ -49,56 +97,16 @@ class ProductPageAgent(BaseAgent):
         
         product: Product = shared_data["parser"]
         
-        system_prompt = """You are a professional product copywriter for skincare e-commerce.
-Generate compelling, accurate product page content based on provided data.
-Write in a clear, engaging style that informs and persuades customers."""
-        
-        user_prompt = f"""Create product page content for:
-
-Product Data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
-
-Generate a JSON object with these fields:
-{{
-  "description": "2-3 sentence compelling product description",
-  "benefits_section": "Formatted benefits text highlighting what it does",
-  "usage_section": "Clear usage instructions with tips",
-  "ingredients_section": "Explanation of key ingredients and their roles",
-  "safety_section": "Safety information and precautions"
-}}
-
-Write naturally, professionally. Base everything on the data provided. Return ONLY valid JSON."""
-        
-        content = llm_client.generate_json(system_prompt, user_prompt, max_tokens=1500)
-        
-        # Ensure all fields have defaults
-        content.setdefault("description", f"{product.name} is a premium skincare product.")
-        content.setdefault("benefits_section", product.benefits)
-        content.setdefault("usage_section", product.how_to_use)
-        content.setdefault("ingredients_section", ", ".join(product.key_ingredients))
-        content.setdefault("safety_section", product.side_effects)
+        user_prompt = USER_TEMPLATE.format(context_block=product.context_block)
         
-        # Structure using template - use field names expected by ProductTemplate
-        product_data = {
-            "name": product.name,
-            "description": content["description"],  # LLM-generated description
-            "concentration": product.concentration,
-            "benefits": content["benefits_section"] if isinstance(content["benefits_section"], list) else product.benefits,
-            "how_to_use": content["usage_section"],
-            "key_ingredients": product.key_ingredients,
-            "price": product.price,
-            "side_effects": content["safety_section"]
-        }
+        llm_client = get_llm_client()
+        # Streamed: returns once the JSON object closes instead of at end of stream.
+        # Parsed and validated in one pass; fields the LLM omitted are None.
+        content = llm_client.stream_json(
+            SYSTEM_PROMPT, user_prompt, max_tokens=1500, response_model=ProductPageContent
+        )
         
-        template = ProductTemplate()
-        product_output = template.build(product_data)
+        product_output = build_product_page(product, content)
         
         self.output = product_output
         self.mark_complete()
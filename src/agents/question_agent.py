@@ -4,10 +4,26 @@ Question Agent Module
 Agent responsible for generating questions from product content using LLM.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List
 from src.agents.base_agent import BaseAgent
 from src.models.schemas import Product, Question, QuestionCategory
-from src.llm_client import llm_client
+from src.llm_client import get_llm_client
+
+
+# (category, count, focus) per question category; rendered into the prompt once
+# and shared with the question node in src.graph.workflow
+QUESTION_SPECS = (
+    (QuestionCategory.INFORMATIONAL, 4, "about benefits, ingredients, what it does, concentration"),
+    (QuestionCategory.SAFETY, 3, "side effects, who should avoid, warnings, allergies"),
+    (QuestionCategory.USAGE, 3, "how to apply, when to use, frequency, routine placement"),
+    (QuestionCategory.PURCHASE, 3, "price, value, where to buy, alternatives"),
+    (QuestionCategory.COMPARISON, 2, "vs other products, how it differs"),
+)
+QUESTION_COUNT = sum(count for _, count, _ in QUESTION_SPECS)
+QUESTION_CATEGORY_LINES = "\n".join(
+    f"- {count} {category.name} questions ({focus})"
+    for category, count, focus in QUESTION_SPECS
+)
 
 
 class QuestionGenerationAgent(BaseAgent):
@@ -22,13 +38,13 @@ class QuestionGenerationAgent(BaseAgent):
         super().__init__(agent_id="questions")
         self.dependencies: List[str] = ["parser"]
     
-    def can_execute(self, completed_agents: List[str]) -> bool:
+    def can_execute(self, completed_agents: FrozenSet[str]) -> bool:
         """
         Check if this agent can execute.
         Returns True only if the parser agent has completed.
         
         Args:
-            completed_agents: List of agent IDs that have completed execution
+            completed_agents: Set of agent IDs that have completed execution
             
         Returns:
             True if 'parser' is in completed_agents
@@ -53,21 +69,10 @@ class QuestionGenerationAgent(BaseAgent):
 Questions should cover multiple categories: Informational, Safety, Usage, Purchase, and Comparison."""
         
         user_prompt = f"""Given this product data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
+{product.context_block}
 
-Generate EXACTLY 15 user questions across these categories:
-- 4 INFORMATIONAL questions (about benefits, ingredients, what it does, concentration)
-- 3 SAFETY questions (side effects, who should avoid, warnings, allergies)
-- 3 USAGE questions (how to apply, when to use, frequency, routine placement)
-- 3 PURCHASE questions (price, value, where to buy, alternatives)
-- 2 COMPARISON questions (vs other products, how it differs)
+Generate EXACTLY {QUESTION_COUNT} user questions across these categories:
+{QUESTION_CATEGORY_LINES}
 
 Return ONLY a JSON array with this structure:
 [
@@ -78,16 +83,14 @@ Return ONLY a JSON array with this structure:
 
 Use natural language. Make questions realistic and varied."""
         
+        llm_client = get_llm_client()
         response = llm_client.generate_json(system_prompt, user_prompt)
         
         # Convert to Question objects
-        questions: List[Question] = []
-        for q_data in response:
-            questions.append(Question(
-                id=q_data["id"],
-                text=q_data["text"],
-                category=q_data["category"]
-            ))
+        questions: List[Question] = [
+            Question(id=q_data["id"], text=q_data["text"], category=q_data["category"])
+            for q_data in response
+        ]
         
         self.output = questions
         self.mark_complete()
@@ -21,9 +21,27 @@ DEFAULT_DATASET_PATH = os.getenv(
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", str(PROJECT_ROOT / "output"))
 
 # LLM Configuration
-AGENT_DELAY = int(os.getenv("AGENT_DELAY", "5"))
+AGENT_DELAY = int(os.getenv("AGENT_DELAY", "5"))  # Seconds to refill one rate-limit token
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "3"))  # LLM calls allowed back-to-back
 DEFAULT_MAX_RETRIES = int(os.getenv("DEFAULT_MAX_RETRIES", "3"))
 DEFAULT_MAX_TOKENS = int(os.getenv("DEFAULT_MAX_TOKENS", "2000"))
 
+# LLM Response Cache Configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", str(PROJECT_ROOT / ".llm_cache"))
+# Seconds a cached response stays valid (0 keeps entries until cleared)
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "604800"))
+# Semantic tier needs sentence-transformers + faiss-cpu (optional)
+LLM_SEMANTIC_CACHE = os.getenv("LLM_SEMANTIC_CACHE", "0") == "1"
+LLM_SEMANTIC_THRESHOLD = float(os.getenv("LLM_SEMANTIC_THRESHOLD", "0.97"))
+
+# Execution Configuration
+# Upper bound on workflow nodes LangGraph runs concurrently in one superstep
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+# Upper bound on products processed at once by AgentOrchestrator.execute_batch
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Upper bound on Groq requests in flight at once, across all callers
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
 # Validation Configuration
 MIN_FAQ_COUNT = 15  # Hard requirement from assignment
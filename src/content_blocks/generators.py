@@ -20,7 +20,7 @@ def extract_product_summary(product: Product) -> str:
     Returns:
         Brief product summary string
     """
-    return f"{product.name} - {product.concentration} for {', '.join(product.skin_type)} skin"
+    return f"{product.name} - {product.concentration} for {product.skin_type_csv} skin"
 
 
 def calculate_price_difference(price_a: str, price_b: str) -> Dict[str, str]:
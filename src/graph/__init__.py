@@ -2,9 +2,19 @@
 Graph Module
 
 LangGraph-based workflow orchestration for the content generation system.
+
+The workflow (LangGraph, LLM SDK) is imported lazily on first access, so
+importing the state schema stays cheap.
 """
 
 from src.graph.state import ContentGenerationState
-from src.graph.workflow import create_workflow, content_workflow
 
 __all__ = ["ContentGenerationState", "create_workflow", "content_workflow"]
+
+
+def __getattr__(name: str):
+    """Resolve workflow exports on first access (PEP 562)."""
+    if name in ("create_workflow", "content_workflow"):
+        from src.graph import workflow
+        return getattr(workflow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,25 +5,96 @@ Defines the LangGraph workflow for the content generation pipeline.
 Uses StateGraph to orchestrate agents with DAG-based dependencies.
 """
 
-import os
-import time
-from typing import Dict, Any
-from langgraph.graph import StateGraph, START, END
+from typing import TYPE_CHECKING, Dict, Any
 
 from src.graph.state import ContentGenerationState
-from src.models.schemas import Product, Question
-from src.templates.template_definitions import FAQTemplate, ProductTemplate, ComparisonTemplate
+from src.models.schemas import Product, ProductPageContent, Question
+from src.templates.template_definitions import FAQTemplate
 from src.llm_client import get_llm_client
+from src.config import MIN_FAQ_COUNT
+from src.agents.comparison_agent import COMPARISON_TASK, build_comparison_page
+from src.agents.product_agent import build_product_page
+from src.agents.question_agent import QUESTION_CATEGORY_LINES, QUESTION_COUNT
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
-# Rate limiting delay between LLM calls (configurable via env)
-AGENT_DELAY = int(os.getenv("AGENT_DELAY", "5"))
 
+# Every LLM call sends the same system prompt followed by the product block, so
+# all requests for one product share a byte-identical prefix that provider-side
+# prefix caching can reuse; only the task text after the marker differs. Each
+# node passes its own cache_namespace so the response cache's semantic tier
+# does not match one task's prompt against another's
+_SYSTEM_PROMPT = """You are a skincare product expert writing content for an e-commerce site.
+Follow the task instructions exactly and base everything on the product data provided."""
 
-def _delay_for_rate_limit():
-    """Add delay between LLM calls to respect rate limits."""
-    print(f"Waiting {AGENT_DELAY}s to respect rate limits...")
-    time.sleep(AGENT_DELAY)
+_TASK_MARKER = "\n\n---TASK---\n"
+
+_QUESTIONS_TASK = f"""Act as a customer service specialist. Generate diverse, natural user questions about this product and answer each one.
+Questions should cover multiple categories: Informational, Safety, Usage, Purchase, and Comparison.
+Answers should be informative yet concise (2-4 sentences each).
+
+Generate EXACTLY {QUESTION_COUNT} user questions across these categories:
+{QUESTION_CATEGORY_LINES}
+
+Return ONLY a JSON object with this structure:
+{{
+  "questions": [
+    {{"id": "q1", "text": "question text here", "category": "INFORMATIONAL", "answer": "helpful answer based on product data"}},
+    {{"id": "q2", "text": "question text here", "category": "SAFETY", "answer": "helpful answer based on product data"}},
+    ...
+  ]
+}}
+
+Use natural language. Make questions realistic and varied. Base all answers on the product data provided."""
+
+_PRODUCT_PAGE_TASK = """Act as a professional product copywriter. Create product page content for this product.
+Write in a clear, engaging style that informs and persuades customers.
+
+Generate a JSON object with these fields:
+{
+  "description": "2-3 sentence compelling product description",
+  "benefits_section": "Formatted benefits text highlighting what it does",
+  "usage_section": "Clear usage instructions with tips",
+  "ingredients_section": "Explanation of key ingredients and their roles",
+  "safety_section": "Safety information and precautions"
+}
+
+Write naturally, professionally. Base everything on the data provided. Return ONLY valid JSON."""
+
+
+def _task_prompt(product: Product, task: str) -> str:
+    """Build a user prompt as the shared product prefix followed by the task."""
+    return "Product Data:\n" + product.context_block + _TASK_MARKER + task
+
+
+def _check_questions_response(response: Any) -> None:
+    """
+    Reject a questions response that cannot yield a full FAQ page.
+    
+    Raises:
+        ValueError: If fewer than MIN_FAQ_COUNT questions carry an answer
+    """
+    questions = response.get("questions") if isinstance(response, dict) else None
+    if not isinstance(questions, list):
+        raise ValueError("Response missing 'questions' list")
+    answered = sum(1 for q in questions if isinstance(q, dict) and q.get("answer"))
+    if answered < MIN_FAQ_COUNT:
+        raise ValueError(f"Only {answered} answered questions, need at least {MIN_FAQ_COUNT}")
+
+
+def _check_comparison_response(response: Any) -> None:
+    """
+    Reject a comparison response without a competitor or comparison object.
+    
+    Raises:
+        ValueError: If 'product_b' or 'comparison' is missing or not an object
+    """
+    if not isinstance(response, dict):
+        raise ValueError("Comparison response must be a JSON object")
+    for key in ("product_b", "comparison"):
+        if not isinstance(response.get(key), dict) or not response[key]:
+            raise ValueError(f"Comparison response missing '{key}' object")
 
 
 # ============================================================================
@@ -39,16 +110,8 @@ def parse_product(state: ContentGenerationState) -> Dict[str, Any]:
     
     raw_data = state["raw_input"]
     
-    product = Product(
-        name=raw_data.get("name", ""),
-        concentration=raw_data.get("concentration", ""),
-        skin_type=raw_data.get("skin_type", []),
-        key_ingredients=raw_data.get("key_ingredients", []),
-        benefits=raw_data.get("benefits", []),
-        how_to_use=raw_data.get("how_to_use", ""),
-        side_effects=raw_data.get("side_effects", ""),
-        price=raw_data.get("price", "")
-    )
+    # Dataset input is untrusted: validate at this boundary only
+    product = Product.from_dict(raw_data, validate=True)
     
     print("Node parse_product completed.")
     return {"parsed_product": product}
@@ -56,55 +119,39 @@ def parse_product(state: ContentGenerationState) -> Dict[str, Any]:
 
 def generate_questions(state: ContentGenerationState) -> Dict[str, Any]:
     """
-    Question generation node: Uses LLM to generate categorized questions.
+    Question and FAQ generation node: Uses one LLM call to generate categorized
+    questions together with their answers.
+    
+    Answers need only the product data, which is available once parsing is done,
+    so producing them alongside the questions avoids a second, dependent call.
     """
     print("Executing node: generate_questions...")
     
     product = state["parsed_product"]
     
-    system_prompt = """You are a product content specialist. Generate diverse, natural user questions about skincare products.
-Questions should cover multiple categories: Informational, Safety, Usage, Purchase, and Comparison."""
-    
-    user_prompt = f"""Given this product data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
-
-Generate EXACTLY 15 user questions across these categories:
-- 4 INFORMATIONAL questions (about benefits, ingredients, what it does, concentration)
-- 3 SAFETY questions (side effects, who should avoid, warnings, allergies)
-- 3 USAGE questions (how to apply, when to use, frequency, routine placement)
-- 3 PURCHASE questions (price, value, where to buy, alternatives)
-- 2 COMPARISON questions (vs other products, how it differs)
-
-Return ONLY a JSON array with this structure:
-[
-  {{"id": "q1", "text": "question text here", "category": "INFORMATIONAL"}},
-  {{"id": "q2", "text": "question text here", "category": "SAFETY"}},
-  ...
-]
-
-Use natural language. Make questions realistic and varied."""
-    
     llm_client = get_llm_client()
-    response = llm_client.generate_json(system_prompt, user_prompt)
+    # JSON mode only allows objects, so the question list is wrapped in one;
+    # too few answers is retried and never cached
+    response = llm_client.generate_json(
+        _SYSTEM_PROMPT, _task_prompt(product, _QUESTIONS_TASK), max_tokens=3000, json_mode=True,
+        validate=_check_questions_response, cache_namespace="questions"
+    )
+    
+    questions = [
+        Question(id=q_data["id"], text=q_data["text"], category=q_data["category"], answer=q_data.get("answer"))
+        for q_data in response.get("questions", [])
+    ]
     
-    questions = []
-    for q_data in response:
-        questions.append(Question(
-            id=q_data["id"],
-            text=q_data["text"],
-            category=q_data["category"]
-        ))
+    # Use FAQTemplate to build final output; unanswered questions are left out
+    # and the FAQ count is validated downstream
+    faq_output = FAQTemplate.build([
+        {"question": q.text, "answer": q.answer}
+        for q in questions
+        if q.answer is not None
+    ])
     
     print("Node generate_questions completed.")
-    _delay_for_rate_limit()
-    return {"questions": questions}
+    return {"questions": questions, "faq_output": faq_output}
 
 
 def generate_product_page(state: ContentGenerationState) -> Dict[str, Any]:
@@ -115,60 +162,17 @@ def generate_product_page(state: ContentGenerationState) -> Dict[str, Any]:
     
     product = state["parsed_product"]
     
-    system_prompt = """You are a professional product copywriter for skincare e-commerce.
-Generate compelling, accurate product page content based on provided data.
-Write in a clear, engaging style that informs and persuades customers."""
-    
-    user_prompt = f"""Create product page content for:
-
-Product Data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
-
-Generate a JSON object with these fields:
-{{
-  "description": "2-3 sentence compelling product description",
-  "benefits_section": "Formatted benefits text highlighting what it does",
-  "usage_section": "Clear usage instructions with tips",
-  "ingredients_section": "Explanation of key ingredients and their roles",
-  "safety_section": "Safety information and precautions"
-}}
-
-Write naturally, professionally. Base everything on the data provided. Return ONLY valid JSON."""
-    
     llm_client = get_llm_client()
-    content = llm_client.generate_json(system_prompt, user_prompt, max_tokens=1500)
-    
-    # Ensure all fields have defaults
-    content.setdefault("description", f"{product.name} is a premium skincare product.")
-    content.setdefault("benefits_section", product.benefits)
-    content.setdefault("usage_section", product.how_to_use)
-    content.setdefault("ingredients_section", ", ".join(product.key_ingredients))
-    content.setdefault("safety_section", product.side_effects)
-    
-    # Structure using template
-    product_data = {
-        "name": product.name,
-        "description": content["description"],
-        "concentration": product.concentration,
-        "benefits": content["benefits_section"] if isinstance(content["benefits_section"], list) else product.benefits,
-        "how_to_use": content["usage_section"],
-        "key_ingredients": product.key_ingredients,
-        "price": product.price,
-        "side_effects": content["safety_section"]
-    }
+    # Streamed: returns once the JSON object closes instead of at end of stream.
+    # Parsed and validated in one pass; fields the LLM omitted are None.
+    content = llm_client.stream_json(
+        _SYSTEM_PROMPT, _task_prompt(product, _PRODUCT_PAGE_TASK), max_tokens=1500,
+        response_model=ProductPageContent, cache_namespace="product_page"
+    )
     
-    template = ProductTemplate()
-    product_output = template.build(product_data)
+    product_output = build_product_page(product, content)
     
     print("Node generate_product_page completed.")
-    _delay_for_rate_limit()
     return {"product_output": product_output}
 
 
@@ -180,172 +184,36 @@ def generate_comparison_page(state: ContentGenerationState) -> Dict[str, Any]:
     
     product_a = state["parsed_product"]
     
-    # Step 1: Generate fictional competitor
-    system_prompt = """You are a product data specialist. Create realistic fictional competitor products for comparison."""
-    
-    user_prompt = f"""Given this real product:
-Name: {product_a.name}
-Concentration: {product_a.concentration}
-Skin Type: {', '.join(product_a.skin_type)}
-Ingredients: {', '.join(product_a.key_ingredients)}
-Benefits: {', '.join(product_a.benefits)}
-Price: {product_a.price}
-
-Create a fictional competitor product (Product B) with this exact JSON structure:
-{{
-  "name": "fictional product name (similar category but different brand)",
-  "concentration": "different concentration of similar active ingredient",
-  "skin_type": ["different skin types"],
-  "key_ingredients": ["3-4 ingredients, some overlapping, some unique"],
-  "benefits": ["2-3 benefits, some similar, some different"],
-  "how_to_use": "usage instructions",
-  "side_effects": "potential side effects",
-  "price": "price in ₹ (make it 15-30% different)"
-}}
-
-Make it realistic and competitive. Return ONLY valid JSON."""
-    
-    llm_client = get_llm_client()
-    product_b_data = llm_client.generate_json(system_prompt, user_prompt, max_tokens=800)
-    
-    # Ensure all required fields exist with defaults
-    product_b_data.setdefault("name", "Competitor Vitamin C Serum")
-    product_b_data.setdefault("concentration", "15% Vitamin C")
-    product_b_data.setdefault("skin_type", ["Normal", "Dry"])
-    product_b_data.setdefault("key_ingredients", ["Vitamin C", "Vitamin E"])
-    product_b_data.setdefault("benefits", ["Brightening", "Anti-aging"])
-    product_b_data.setdefault("how_to_use", "Apply 2-3 drops daily")
-    product_b_data.setdefault("side_effects", "May cause mild irritation")
-    product_b_data.setdefault("price", "₹799")
-    
-    product_b = Product(**product_b_data)
-    
-    _delay_for_rate_limit()
-    
-    # Step 2: Generate comparison analysis
-    system_prompt = """You are a product comparison expert. Analyze and compare skincare products objectively."""
-    
-    user_prompt = f"""Compare these two products:
-
-Product A: {product_a.name}
-- Concentration: {product_a.concentration}
-- Ingredients: {', '.join(product_a.key_ingredients)}
-- Benefits: {', '.join(product_a.benefits)}
-- Price: {product_a.price}
-- Skin Type: {', '.join(product_a.skin_type)}
-
-Product B: {product_b.name}
-- Concentration: {product_b.concentration}
-- Ingredients: {', '.join(product_b.key_ingredients)}
-- Benefits: {', '.join(product_b.benefits)}
-- Price: {product_b.price}
-- Skin Type: {', '.join(product_b.skin_type)}
-
-Generate a JSON comparison with:
-{{
-  "ingredient_comparison": {{
-    "common": ["shared ingredients"],
-    "unique_to_a": ["ingredients only in A"],
-    "unique_to_b": ["ingredients only in B"],
-    "analysis": "2 sentence comparison of ingredient profiles"
-  }},
-  "price_comparison": {{
-    "price_difference": "₹ amount and percentage",
-    "value_assessment": "which offers better value and why (2 sentences)"
-  }},
-  "effectiveness_comparison": {{
-    "concentration_analysis": "comparison of active ingredient concentrations",
-    "benefit_overlap": ["shared benefits"],
-    "unique_benefits_a": ["benefits unique to A"],
-    "unique_benefits_b": ["benefits unique to B"]
-  }},
-  "recommendation": "1-2 sentences on which product suits which skin type/concern better"
-}}
-
-Return ONLY valid JSON."""
-    
     llm_client = get_llm_client()
-    comparison_metrics = llm_client.generate_json(system_prompt, user_prompt, max_tokens=1200)
-    
-    # Structure using template
-    template = ComparisonTemplate()
-    comparison_output = template.build(
-        product_a.model_dump(),
-        product_b.model_dump(),
-        [comparison_metrics]
+    response = llm_client.generate_json(
+        _SYSTEM_PROMPT, _task_prompt(product_a, COMPARISON_TASK), max_tokens=2000, json_mode=True,
+        validate=_check_comparison_response, cache_namespace="comparison"
     )
+    comparison_output = build_comparison_page(product_a, response)
     
     print("Node generate_comparison_page completed.")
-    _delay_for_rate_limit()
     return {"comparison_output": comparison_output}
 
 
-def generate_faq_page(state: ContentGenerationState) -> Dict[str, Any]:
-    """
-    FAQ page generation node: Uses LLM to generate answers for questions.
-    Depends on questions being generated first.
-    """
-    print("Executing node: generate_faq_page...")
-    
-    product = state["parsed_product"]
-    questions = state["questions"]
-    
-    # Format questions for LLM
-    questions_text = "\n".join([f"{i+1}. [{q.category}] {q.text}" for i, q in enumerate(questions)])
-    
-    system_prompt = """You are a skincare product expert and customer service specialist.
-Generate helpful, accurate, and engaging FAQ answers based on product data.
-Answers should be informative yet concise (2-4 sentences each)."""
-    
-    user_prompt = f"""Generate FAQ answers for this product:
-
-Product Data:
-Name: {product.name}
-Concentration: {product.concentration}
-Skin Type: {', '.join(product.skin_type)}
-Ingredients: {', '.join(product.key_ingredients)}
-Benefits: {', '.join(product.benefits)}
-Usage: {product.how_to_use}
-Side Effects: {product.side_effects}
-Price: {product.price}
-
-Questions to answer:
-{questions_text}
-
-Return a JSON array with this structure:
-[
-  {{"question": "exact question text", "answer": "helpful answer based on product data"}},
-  ...
-]
-
-Base all answers on the product data provided. Be helpful and accurate. Return ONLY valid JSON."""
-    
-    llm_client = get_llm_client()
-    faq_items = llm_client.generate_json(system_prompt, user_prompt, max_tokens=2000)
-    
-    # Use FAQTemplate to build final output
-    faq_output = FAQTemplate.build(faq_items)
-    
-    print("Node generate_faq_page completed.")
-    return {"faq_output": faq_output}
-
-
 # ============================================================================
 # Workflow Graph Definition
 # ============================================================================
 
-def create_workflow() -> StateGraph:
+def create_workflow() -> "StateGraph":
     """
     Create and compile the LangGraph workflow for content generation.
     
     DAG Structure:
     - parse_product (no deps) → runs first
-    - generate_questions, generate_product_page, generate_comparison_page (dep: parse_product)
-    - generate_faq_page (deps: parse_product, generate_questions) → runs after questions
+    - generate_questions (questions + FAQ answers), generate_product_page,
+      generate_comparison_page (dep: parse_product)
     
     Returns:
         Compiled LangGraph StateGraph
     """
+    # Imported here so loading the node functions does not pull in LangGraph
+    from langgraph.graph import StateGraph, START, END
+    
     # Create the graph with our state type
     workflow = StateGraph(ContentGenerationState)
     
@@ -354,7 +222,6 @@ def create_workflow() -> StateGraph:
     workflow.add_node("generate_questions", generate_questions)
     workflow.add_node("generate_product_page", generate_product_page)
     workflow.add_node("generate_comparison_page", generate_comparison_page)
-    workflow.add_node("generate_faq_page", generate_faq_page)
     
     # Define edges (DAG structure)
     # START -> parse_product
@@ -365,17 +232,19 @@ def create_workflow() -> StateGraph:
     workflow.add_edge("parse_product", "generate_product_page")
     workflow.add_edge("parse_product", "generate_comparison_page")
     
-    # questions -> faq (sequential dependency)
-    workflow.add_edge("generate_questions", "generate_faq_page")
-    
     # All terminal nodes -> END
+    workflow.add_edge("generate_questions", END)
     workflow.add_edge("generate_product_page", END)
     workflow.add_edge("generate_comparison_page", END)
-    workflow.add_edge("generate_faq_page", END)
     
     # Compile and return
     return workflow.compile()
 
 
-# Create singleton workflow instance
-content_workflow = create_workflow()
+def __getattr__(name: str):
+    """Compile the singleton workflow instance on first access (PEP 562)."""
+    if name == "content_workflow":
+        global content_workflow
+        content_workflow = create_workflow()
+        return content_workflow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,378 @@
 import os
-import json
+import re
+import atexit
 import time
+import hashlib
+import functools
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+import diskcache
+import httpx
+import orjson
 from groq import Groq
 from dotenv import load_dotenv
+from pydantic import BaseModel
 
 load_dotenv()
 
+from src.config import (
+    AGENT_DELAY,
+    RATE_LIMIT_BURST,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_DIR,
+    LLM_CACHE_TTL,
+    LLM_SEMANTIC_CACHE,
+    LLM_SEMANTIC_THRESHOLD,
+    LLM_MAX_CONCURRENCY,
+)
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder():
+    """Load the sentence embedding model once per process (optional dependency)."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    # Single short prompts embed fast on one thread; more only contends with
+    # the HTTP worker threads of parallel branches
+    torch.set_num_threads(1)
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for parsed LLM JSON responses.
+    
+    - Exact tier: SHA256 of model, prompts and max_tokens, persisted on disk
+      as orjson-encoded bytes
+    - Semantic tier (optional): cosine similarity of user prompt embeddings,
+      searched with a FAISS inner-product index over normalized vectors; one
+      index per namespace (model, system prompt, max_tokens and the caller's
+      task name), so a similar prompt from another request type is never
+      matched. The indexes are
+      saved next to the store on close() and reloaded on start
+    
+    Entries expire after `expire` seconds so a stale response cannot be
+    served forever.
+    """
+    
+    def __init__(self, directory: str, semantic: bool = False, threshold: float = 0.97,
+                 expire: Optional[float] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory: Directory backing the on-disk exact-match store
+            semantic: Enable the embedding-based semantic tier
+            threshold: Minimum cosine similarity for a semantic hit
+            expire: Seconds an entry stays valid (None keeps it until cleared)
+        """
+        self._directory = directory
+        self._store = diskcache.Cache(directory)
+        self._expire = expire
+        self._semantic = semantic
+        self._threshold = threshold
+        # Per-namespace FAISS indexes and the exact keys of their rows
+        self._indexes: Dict[str, Any] = {}
+        self._index_keys: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        if semantic:
+            self._load_index()
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Build the exact-match key for a request."""
+        # NUL-separated so field boundaries cannot shift between requests
+        raw = "\x00".join((model, system_prompt, user_prompt, str(max_tokens)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def make_namespace(model: str, system_prompt: str, max_tokens: int, task: str = "") -> str:
+        """
+        Build the semantic-tier namespace: everything in the key except the
+        user prompt, plus a task name for callers that share a system prompt.
+        """
+        raw = "\x00".join((model, system_prompt, str(max_tokens), task))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+    
+    def _embed(self, text: str):
+        """Embed text as a normalized float32 row vector."""
+        return _get_embedder().encode(
+            [text], normalize_embeddings=True, convert_to_numpy=True
+        ).astype("float32")
+    
+    def get(self, key: str, user_prompt: str, namespace: str = "") -> Optional[Any]:
+        """
+        Look up a cached response, exact match first then semantic.
+        
+        Args:
+            key: Exact-match key from make_key()
+            user_prompt: User prompt used for the semantic lookup
+            namespace: Semantic namespace from make_namespace(); only prompts
+                stored under the same namespace are searched
+            
+        Returns:
+            Cached parsed response, or None on miss
+        """
+        value = self._load(key)
+        if value is not None:
+            with self._lock:
+                self._hits += 1
+            return value
+        
+        if self._semantic:
+            vector = self._embed(user_prompt)
+            with self._lock:
+                index = self._indexes.get(namespace)
+                if index is not None and index.ntotal:
+                    scores, ids = index.search(vector, 1)
+                    if scores[0][0] >= self._threshold:
+                        value = self._load(self._index_keys[namespace][ids[0][0]])
+                        if value is not None:
+                            self._semantic_hits += 1
+                            return value
+        
+        with self._lock:
+            self._misses += 1
+        return None
+    
+    def set(self, key: str, user_prompt: str, value: Any, namespace: str = "") -> None:
+        """
+        Store a parsed response under both cache tiers.
+        
+        Args:
+            key: Exact-match key from make_key()
+            user_prompt: User prompt indexed for semantic lookups
+            value: Parsed JSON response
+            namespace: Semantic namespace from make_namespace()
+        """
+        self._store.set(key, orjson.dumps(value), expire=self._expire)
+        
+        if self._semantic:
+            import faiss
+            vector = self._embed(user_prompt)
+            with self._lock:
+                index = self._indexes.get(namespace)
+                if index is None:
+                    index = self._indexes[namespace] = faiss.IndexFlatIP(vector.shape[1])
+                    self._index_keys[namespace] = []
+                index.add(vector)
+                self._index_keys[namespace].append(key)
+    
+    def _load(self, key: str) -> Optional[Any]:
+        """Read and decode a stored response (None if absent)."""
+        raw = self._store.get(key)
+        # Values are orjson bytes, which diskcache stores without pickling;
+        # anything else predates that format and counts as a miss
+        if not isinstance(raw, bytes):
+            return None
+        return orjson.loads(raw)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of stored entries."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "size": len(self._store),
+            }
+    
+    def _keys_path(self) -> str:
+        """Return the file mapping each namespace to its index row keys."""
+        return os.path.join(self._directory, "semantic_keys.json")
+    
+    def _index_path(self, namespace: str) -> str:
+        """Return the file holding one namespace's semantic index."""
+        return os.path.join(self._directory, f"semantic-{namespace}.faiss")
+    
+    def _load_index(self) -> None:
+        """Restore the semantic indexes saved by an earlier process, if any."""
+        keys_path = self._keys_path()
+        if not os.path.exists(keys_path):
+            return
+        with open(keys_path, "rb") as f:
+            saved = orjson.loads(f.read())
+        # A single un-namespaced list predates per-namespace indexes; start over
+        if not isinstance(saved, dict):
+            return
+        import faiss
+        for namespace, keys in saved.items():
+            index_path = self._index_path(namespace)
+            if os.path.exists(index_path):
+                self._indexes[namespace] = faiss.read_index(index_path)
+                self._index_keys[namespace] = keys
+    
+    def save(self) -> None:
+        """Persist the semantic indexes so later runs can hit them."""
+        with self._lock:
+            if not self._indexes:
+                return
+            import faiss
+            for namespace, index in self._indexes.items():
+                faiss.write_index(index, self._index_path(namespace))
+            with open(self._keys_path(), "wb") as f:
+                f.write(orjson.dumps(self._index_keys))
+    
+    def close(self) -> None:
+        """Save the semantic index and release the on-disk store."""
+        self.save()
+        self._store.close()
+    
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._store.clear()
+        with self._lock:
+            self._indexes = {}
+            self._index_keys = {}
+            # Per-namespace index files, their key map and any legacy single index
+            for name in os.listdir(self._directory):
+                if name.startswith("semantic") and name.endswith((".faiss", ".json")):
+                    os.remove(os.path.join(self._directory, name))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for spacing out LLM calls.
+    
+    Holds up to `capacity` tokens and regains one every `interval` seconds,
+    so bursts of up to `capacity` calls proceed immediately and callers only
+    wait when the bucket is empty.
+    """
+    
+    def __init__(self, interval: float, capacity: int):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            interval: Seconds to regain one token (<= 0 disables limiting)
+            capacity: Maximum number of stored tokens
+        """
+        self.interval = interval
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """
+        Take one token.
+        
+        Returns:
+            Seconds the caller must wait before using the token (0 if available)
+        """
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed / self.interval)
+            self._updated = now
+            # Going negative reserves a future token, staggering concurrent waiters
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens * self.interval
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's retry-after header from an API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class JSONStreamScanner:
+    """
+    Incremental scanner that detects when a streamed JSON value is complete.
+    
+    Tracks bracket depth outside of string literals; any prose before the
+    first bracket is ignored.
+    """
+    
+    def __init__(self):
+        """Initialize an empty scanner."""
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escaped = False
+        self.complete = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next chunk of streamed text.
+        
+        Args:
+            text: Next chunk of model output
+            
+        Returns:
+            True once the top-level JSON array or object has been closed
+        """
+        for char in text:
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._started:
+                    self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                self._started = True
+            elif char in "]}" and self._started:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+        return self.complete
+
+
+# JSON repair patterns, compiled once
+_JSON_EXTRACT = re.compile(r'(\[[\s\S]*\]|\{[\s\S]*\})')
+_CTRL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_STRING_RE = re.compile(r'"[^"]*"')
+
+
+def _fix_string_newlines(match: "re.Match[str]") -> str:
+    """Escape raw newlines inside a matched JSON string literal."""
+    return match.group(0).replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _repair_json(response: str) -> str:
+    """
+    Clean up common LLM formatting problems so the text parses as JSON.
+    
+    Only used when the raw response fails to parse.
+    """
+    # Clean up markdown code blocks if present
+    response = response.replace("```json", "").replace("```", "").strip()
+    
+    # Extract the outermost array [...] or object {...}
+    json_match = _JSON_EXTRACT.search(response)
+    if json_match:
+        response = json_match.group(1)
+    
+    # Remove control characters except newlines and tabs
+    response = _CTRL_CHARS.sub('', response)
+    
+    # Fix unescaped newlines within strings (common LLM issue)
+    return _STRING_RE.sub(_fix_string_newlines, response)
+
 
 class LLMClient:
     def __init__(self):
@@ -13,30 +380,63 @@ class LLMClient:
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         
-        self.client = Groq(api_key=api_key)
+        # One pooled HTTP/2 connection shared by all calls, including the
+        # concurrent ones issued by parallel workflow branches and batch runs;
+        # sized to the request semaphore so every slot can keep a warm connection
+        self._http = httpx.Client(
+            http2=True,
+            timeout=60,
+            limits=httpx.Limits(
+                max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                max_connections=LLM_MAX_CONCURRENCY * 2
+            )
+        )
+        self.client = Groq(api_key=api_key, http_client=self._http)
+        # Caps requests in flight so concurrent branches stay within provider limits
+        self._call_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        # Paces request starts; callers only wait once the burst is spent
+        self.limiter = TokenBucket(interval=AGENT_DELAY, capacity=RATE_LIMIT_BURST)
         # Groq's fastest and most capable model
         self.model = "llama-3.3-70b-versatile"
         print(f"Using model: {self.model}")
+        
+        # Parsed JSON responses keyed by request (None when disabled)
+        self.cache: Optional[ResponseCache] = None
+        if LLM_CACHE_ENABLED:
+            self.cache = ResponseCache(
+                LLM_CACHE_DIR,
+                semantic=LLM_SEMANTIC_CACHE,
+                threshold=LLM_SEMANTIC_THRESHOLD,
+                expire=LLM_CACHE_TTL or None
+            )
+    
+    def close(self) -> None:
+        """Close the pooled HTTP connections and persist the cache."""
+        self._http.close()
+        if self.cache is not None:
+            self.cache.close()
     
-    def generate(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3) -> str:
-        """Generate content using Groq with retry logic"""
+    def _with_rate_limit_retry(self, call: Callable[[], str], max_retries: int) -> str:
+        """
+        Run an API call under the rate limiter, retrying on rate limit errors.
         
+        A 429 waits for the server's retry-after when given, otherwise backs
+        off linearly.
+        """
         for attempt in range(max_retries):
+            wait = self.limiter.acquire()
+            if wait > 0:
+                print(f"Waiting {wait:.1f}s to respect rate limits...")
+                time.sleep(wait)
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content
+                with self._call_slots:
+                    return call()
             except Exception as e:
                 error_str = str(e)
                 if "rate" in error_str.lower() or "limit" in error_str.lower() or "429" in error_str:
-                    wait_time = (attempt + 1) * 10  # 10s, 20s, 30s
+                    wait_time = _retry_after_seconds(e)
+                    if wait_time is None:
+                        wait_time = (attempt + 1) * 10  # 10s, 20s, 30s
                     print(f"Rate limit hit. Waiting {wait_time}s before retry {attempt + 1}/{max_retries}...")
                     time.sleep(wait_time)
                 else:
@@ -45,10 +445,116 @@ class LLMClient:
         
         raise Exception("Max retries exceeded for rate limiting")
     
-    def generate_json(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3) -> dict:
-        """Generate JSON output using Groq with retry logic for JSON parsing"""
-        import re
+    def generate(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3,
+                 json_mode: bool = False) -> str:
+        """
+        Generate content using Groq with retry logic.
+        
+        json_mode requests Groq's JSON object mode, which constrains the output
+        to a single JSON object (no prose or markdown fences).
+        """
+        # Only sent when requested; JSON mode rejects array-shaped prompts
+        extra: Dict[str, Any] = {"response_format": {"type": "json_object"}} if json_mode else {}
+        
+        def call() -> str:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.7,
+                **extra
+            )
+            return response.choices[0].message.content
+        
+        return self._with_rate_limit_retry(call, max_retries)
+    
+    def _open_stream(self, system_prompt: str, user_prompt: str, max_tokens: int):
+        """Start a streamed Groq completion."""
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True
+        )
+    
+    @staticmethod
+    def _iter_deltas(stream) -> Iterator[str]:
+        """Yield the non-empty content deltas of a completion stream."""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    
+    def generate_stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000,
+                        max_retries: int = 3) -> Iterator[str]:
+        """
+        Yield content as Groq generates it, for progressive rendering.
+        
+        Rate limit retries cover opening the stream; closing the generator
+        early closes the underlying connection.
+        """
+        stream = self._with_rate_limit_retry(
+            lambda: self._open_stream(system_prompt, user_prompt, max_tokens), max_retries
+        )
+        try:
+            yield from self._iter_deltas(stream)
+        finally:
+            stream.close()
+    
+    def generate_streamed(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3) -> str:
+        """
+        Generate content using a streamed Groq completion.
+        
+        Returns as soon as the top-level JSON value in the output closes, so
+        trailing tokens are never waited for.
+        """
+        
+        def call() -> str:
+            stream = self._open_stream(system_prompt, user_prompt, max_tokens)
+            scanner = JSONStreamScanner()
+            parts: List[str] = []
+            try:
+                for delta in self._iter_deltas(stream):
+                    parts.append(delta)
+                    if scanner.feed(delta):
+                        break
+            finally:
+                stream.close()
+            return "".join(parts)
+        
+        return self._with_rate_limit_retry(call, max_retries)
+    
+    def generate_json(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3,
+                      stream: bool = False, response_model: Optional[Type[BaseModel]] = None,
+                      json_mode: bool = False, validate: Optional[Callable[[Any], None]] = None,
+                      use_cache: bool = True, cache_namespace: str = "") -> Any:
+        """
+        Generate JSON output using Groq with retry logic for JSON parsing.
+        
+        When response_model is given, the response is parsed and validated into
+        that Pydantic model in a single pass (a validation failure is retried
+        like a parse error). json_mode (object-shaped outputs only, not with
+        stream) has Groq guarantee a bare JSON object.
+        
+        The raw response is parsed directly; the regex repair pass only runs
+        when that fails.
         
+        validate receives the parsed result and raises ValueError to reject it;
+        a rejected response is retried and never cached, and a cached entry it
+        rejects counts as a miss. use_cache=False skips the cache entirely.
+        
+        cache_namespace names the task; callers that share one system prompt
+        across tasks must set it so the semantic tier keeps their prompts apart.
+        """
         # Add stronger JSON instruction to system prompt
         json_system_prompt = f"""{system_prompt}
 
@@ -60,44 +566,76 @@ CRITICAL INSTRUCTIONS:
 5. Use double quotes for all strings
 6. Do NOT include newlines within string values"""
         
+        parse = response_model.model_validate_json if response_model is not None else orjson.loads
+        
+        cache = self.cache if use_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = ResponseCache.make_key(self.model, system_prompt, user_prompt, max_tokens)
+            namespace = ResponseCache.make_namespace(self.model, system_prompt, max_tokens, cache_namespace)
+            cached = cache.get(cache_key, user_prompt, namespace)
+            if cached is not None:
+                result = response_model.model_validate(cached) if response_model else cached
+                try:
+                    if validate is not None:
+                        validate(result)
+                except ValueError as e:
+                    print(f"Ignoring cached response that failed validation: {e}")
+                else:
+                    return result
+        
         for attempt in range(max_retries):
-            response = self.generate(json_system_prompt, user_prompt, max_tokens)
-            
-            # Clean up markdown code blocks if present
-            response = response.replace("```json", "").replace("```", "").strip()
-            
-            # Try to extract JSON from response using regex
-            # Look for array [...] or object {...}
-            json_match = re.search(r'(\[[\s\S]*\]|\{[\s\S]*\})', response)
-            if json_match:
-                response = json_match.group(1)
-            
-            # Clean up common JSON issues
-            # Remove control characters except newlines and tabs
-            response = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', response)
-            
-            # Fix unescaped newlines within strings (common LLM issue)
-            # This replaces actual newlines between quotes with escaped \n
-            def fix_string_newlines(match):
-                return match.group(0).replace('\n', '\\n').replace('\r', '\\r')
-            
-            # Match strings and fix internal newlines
-            response = re.sub(r'"[^"]*"', fix_string_newlines, response)
+            if stream:
+                response = self.generate_streamed(json_system_prompt, user_prompt, max_tokens)
+            else:
+                response = self.generate(json_system_prompt, user_prompt, max_tokens, json_mode=json_mode)
             
             try:
-                return json.loads(response)
-            except json.JSONDecodeError as e:
-                if attempt < max_retries - 1:
-                    print(f"JSON parse error (attempt {attempt + 1}/{max_retries}): {e}")
-                    print(f"Retrying with fresh LLM call...")
-                    time.sleep(2)  # Brief delay before retry
+                try:
+                    result = parse(response)
+                except ValueError:  # JSONDecodeError or ValidationError
+                    response = _repair_json(response)
+                    result = parse(response)
+            except ValueError as e:
+                error = f"JSON parse error (attempt {attempt + 1}/{max_retries}): {e}"
+                failure = f"Invalid JSON from LLM: {e}"
+            else:
+                try:
+                    if validate is not None:
+                        validate(result)
+                except ValueError as e:
+                    error = f"Response rejected by validation (attempt {attempt + 1}/{max_retries}): {e}"
+                    failure = f"LLM response failed validation: {e}"
                 else:
-                    print(f"Failed to parse JSON response after {max_retries} attempts: {response[:500]}...")
-                    raise ValueError(f"Invalid JSON from LLM: {e}")
+                    # Only responses the caller accepted are cached
+                    if cache is not None:
+                        cached_value = result.model_dump() if response_model else result
+                        cache.set(cache_key, user_prompt, cached_value, namespace)
+                    return result
+            
+            if attempt < max_retries - 1:
+                print(error)
+                print(f"Retrying with fresh LLM call...")
+                time.sleep(2)  # Brief delay before retry
+            else:
+                print(f"Failed to get a usable JSON response after {max_retries} attempts: {response[:500]}...")
+                raise ValueError(failure)
+    
+    def stream_json(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, max_retries: int = 3,
+                    response_model: Optional[Type[BaseModel]] = None,
+                    validate: Optional[Callable[[Any], None]] = None, use_cache: bool = True,
+                    cache_namespace: str = "") -> Any:
+        """Generate JSON output from a streamed completion (see generate_streamed)"""
+        return self.generate_json(system_prompt, user_prompt, max_tokens, max_retries,
+                                  stream=True, response_model=response_model,
+                                  validate=validate, use_cache=use_cache,
+                                  cache_namespace=cache_namespace)
 
 
 # Global instance cache (lazy initialization)
 _llm_client_instance = None
+# Parallel workflow branches may request the client at the same time
+_llm_client_lock = threading.Lock()
 
 
 def get_llm_client():
@@ -117,7 +655,9 @@ def get_llm_client():
         if not api_key:
             # Allow tests to run without API key
             return None
-        _llm_client_instance = LLMClient()
+        with _llm_client_lock:
+            if _llm_client_instance is None:
+                _llm_client_instance = LLMClient()
     
     return _llm_client_instance
 
@@ -125,7 +665,10 @@ def get_llm_client():
 def reset_llm_client():
     """Reset the LLM client instance (useful for testing)."""
     global _llm_client_instance
+    if _llm_client_instance is not None:
+        _llm_client_instance.close()
     _llm_client_instance = None
 
 
-
+# Close pooled connections and save the semantic index on interpreter shutdown
+atexit.register(reset_llm_client)
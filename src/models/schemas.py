@@ -2,10 +2,14 @@
 Data Schemas Module
 
 Pydantic models for data validation.
+Product is a frozen dataclass; Pydantic validation is opt-in for untrusted input.
 """
 
-from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from dataclasses import dataclass, asdict
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Dict, Union
+from pydantic import BaseModel, Field, TypeAdapter
 from enum import Enum
 
 
@@ -18,16 +22,109 @@ class QuestionCategory(str, Enum):
     COMPARISON = "Comparison"
 
 
-class Product(BaseModel):
-    """Schema for product information."""
-    name: str = Field(..., description="Product name")
-    concentration: str = Field(..., description="Product concentration")
-    skin_type: List[str] = Field(..., description="Suitable skin types")
-    key_ingredients: List[str] = Field(..., description="Key ingredients")
-    benefits: List[str] = Field(..., description="Product benefits")
-    how_to_use: str = Field(..., description="Usage instructions")
-    side_effects: str = Field(..., description="Potential side effects")
-    price: str = Field(..., description="Product price")
+@dataclass(frozen=True)
+class Product:
+    """
+    Schema for product information.
+    
+    Direct construction performs no validation; use from_dict(..., validate=True)
+    for data crossing an external boundary (dataset files, LLM output).
+    Derived display strings are computed once per instance and cached.
+    """
+    name: str  # Product name
+    concentration: str  # Product concentration
+    skin_type: List[str]  # Suitable skin types
+    key_ingredients: List[str]  # Key ingredients
+    benefits: List[str]  # Product benefits
+    how_to_use: str  # Usage instructions
+    side_effects: str  # Potential side effects
+    price: str  # Product price
+    
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], validate: bool = False) -> "Product":
+        """
+        Build a Product from raw data, defaulting missing fields to empty values.
+        
+        Args:
+            data: Raw product data dictionary
+            validate: Run Pydantic type validation (for untrusted input)
+            
+        Returns:
+            Product instance
+            
+        Raises:
+            ValidationError: If validate is True and data is invalid
+        """
+        fields = {
+            "name": data.get("name", ""),
+            "concentration": data.get("concentration", ""),
+            "skin_type": data.get("skin_type", []),
+            "key_ingredients": data.get("key_ingredients", []),
+            "benefits": data.get("benefits", []),
+            "how_to_use": data.get("how_to_use", ""),
+            "side_effects": data.get("side_effects", ""),
+            "price": data.get("price", "")
+        }
+        if validate:
+            return _PRODUCT_ADAPTER.validate_python(fields)
+        return cls(**fields)
+    
+    @cached_property
+    def skin_type_csv(self) -> str:
+        """Comma-separated skin types."""
+        return ", ".join(self.skin_type)
+    
+    @cached_property
+    def key_ingredients_csv(self) -> str:
+        """Comma-separated key ingredients."""
+        return ", ".join(self.key_ingredients)
+    
+    @cached_property
+    def benefits_csv(self) -> str:
+        """Comma-separated benefits."""
+        return ", ".join(self.benefits)
+    
+    @cached_property
+    def context_block(self) -> str:
+        """
+        Product data rendered for LLM prompts.
+        
+        Field order and whitespace are fixed so every prompt built from the
+        same product starts with byte-identical text.
+        """
+        return (
+            f"Name: {self.name}\n"
+            f"Concentration: {self.concentration}\n"
+            f"Skin Type: {self.skin_type_csv}\n"
+            f"Ingredients: {self.key_ingredients_csv}\n"
+            f"Benefits: {self.benefits_csv}\n"
+            f"Usage: {self.how_to_use}\n"
+            f"Side Effects: {self.side_effects}\n"
+            f"Price: {self.price}"
+        )
+    
+    def model_dump(self) -> Dict[str, Any]:
+        """Return the product as a plain dictionary (Pydantic-compatible API)."""
+        return asdict(self)
+    
+    @cached_property
+    def dump(self) -> Dict[str, Any]:
+        """
+        Dictionary form computed once per instance.
+        
+        Shared between callers, so treat it as read-only; use model_dump()
+        for a private copy.
+        """
+        return asdict(self)
+    
+    @cached_property
+    def view(self) -> Mapping[str, Any]:
+        """Read-only mapping over dump, safe to hand to templates without copying."""
+        return MappingProxyType(self.dump)
+
+
+# Compiled once; used only on the opt-in validation path
+_PRODUCT_ADAPTER = TypeAdapter(Product)
 
 
 class Question(BaseModel):
@@ -38,6 +135,16 @@ class Question(BaseModel):
     answer: Optional[str] = Field(default=None, description="Question answer")
 
 
+class ProductPageContent(BaseModel):
+    """Schema for LLM-generated product page copy (omitted fields are None)."""
+    description: Optional[str] = Field(default=None, description="Product description")
+    benefits_section: Union[List[str], str, None] = Field(default=None, description="Benefits copy or list")
+    # Sections may come back as bullet lists; the product template stringifies them
+    usage_section: Union[List[str], str, None] = Field(default=None, description="Usage instructions or list")
+    ingredients_section: Union[List[str], str, None] = Field(default=None, description="Ingredient explanation or list")
+    safety_section: Union[List[str], str, None] = Field(default=None, description="Safety information or list")
+
+
 class PageOutput(BaseModel):
     """Schema for page output."""
     page_type: str = Field(..., description="Type of page")
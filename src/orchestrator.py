@@ -6,10 +6,11 @@ This module provides a high-level interface for the content generation pipeline.
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 
-from src.graph.workflow import content_workflow
+from src.graph import workflow
 from src.graph.state import ContentGenerationState
+from src.config import BATCH_CONCURRENCY, MAX_CONCURRENCY
 
 
 class AgentOrchestrator:
@@ -21,13 +22,18 @@ class AgentOrchestrator:
     
     DAG Structure (managed by LangGraph):
     - parse_product (no deps) → runs first
-    - generate_questions, generate_product_page, generate_comparison_page (dep: parse_product)
-    - generate_faq_page (deps: parse_product, generate_questions) → runs after questions
+    - generate_questions (questions + FAQ answers), generate_product_page,
+      generate_comparison_page (dep: parse_product)
+    
+    Nodes whose dependencies are satisfied in the same step (questions, product,
+    comparison) are dispatched concurrently on LangGraph's thread pool, bounded
+    by MAX_CONCURRENCY.
     """
     
     def __init__(self):
         """Initialize the orchestrator with LangGraph workflow."""
-        self.workflow = content_workflow
+        # Resolved here, not at import, so the graph compiles on first use
+        self.workflow = workflow.content_workflow
         self._last_state: Dict[str, Any] = {}
     
     def execute_dag(self, raw_product_data: Dict) -> Dict[str, Any]:
@@ -47,8 +53,11 @@ class AgentOrchestrator:
             "raw_input": raw_product_data
         }
         
-        # Execute the LangGraph workflow
-        final_state = self.workflow.invoke(initial_state)
+        # Execute the LangGraph workflow; ready branches run concurrently
+        final_state = self.workflow.invoke(
+            initial_state,
+            config={"max_concurrency": MAX_CONCURRENCY}
+        )
         
         # Store state for status checks
         self._last_state = final_state
@@ -56,6 +65,54 @@ class AgentOrchestrator:
         print("LangGraph workflow execution completed.")
         
         # Return dict with all page outputs (same interface as before)
+        return self._collect_outputs(final_state)
+    
+    def execute_batch(
+        self, products: List[Dict], parallelism: int = BATCH_CONCURRENCY
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Execute the workflow for several products concurrently.
+        
+        Runs are overlapped on LangGraph's thread pool, bounded by parallelism;
+        the shared LLM client caps requests in flight across all of them.
+        A product whose run fails is reported and does not abort the others.
+        Agent status tracking reflects execute_dag runs only.
+        
+        Args:
+            products: Raw product data dictionaries
+            parallelism: Maximum number of products processed at once
+            
+        Returns:
+            One entry per product, in input order: its outputs dictionary, or
+            the exception its run raised
+        """
+        print(f"Starting LangGraph batch execution for {len(products)} products...")
+        
+        initial_states: List[ContentGenerationState] = [
+            {"raw_input": raw_product_data} for raw_product_data in products
+        ]
+        final_states = self.workflow.batch(
+            initial_states,
+            config={"max_concurrency": parallelism},
+            return_exceptions=True
+        )
+        
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for index, final_state in enumerate(final_states):
+            if isinstance(final_state, Exception):
+                print(f"❌ Product {index} failed: {final_state}")
+                results.append(final_state)
+            else:
+                results.append(self._collect_outputs(final_state))
+        
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        print(f"LangGraph batch execution completed ({failed} of {len(products)} failed).")
+        
+        return results
+    
+    @staticmethod
+    def _collect_outputs(final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the page outputs from a final workflow state."""
         return {
             "faq": final_state.get("faq_output"),
             "product": final_state.get("product_output"),
@@ -4,7 +4,58 @@ Template Definitions Module
 Defines templates for various content types.
 """
 
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Tuple
+
+
+def _s(value: Any) -> str:
+    """Return value unchanged if it is already a str, else its str() form."""
+    return value if type(value) is str else str(value)
+
+
+def _l(value: Any) -> list:
+    """Return value unchanged if it is already a list, else a list copy of it."""
+    return value if type(value) is list else list(value)
+
+
+# Conversion helper emitted for each section type by _compile_page_builder
+_CONVERTERS = {str: "_s", list: "_l"}
+
+
+def _compile_page_builder(page_type: str, sections: Tuple[Tuple[str, str, type], ...]) -> Callable[[Dict], Dict[str, Any]]:
+    """
+    Generate a build function specialized for a fixed section layout.
+    
+    The field accesses and conversions are emitted as straight-line code,
+    so building a page runs no per-field loop. Values that already have the
+    section's type are passed through without a str() or list() call, so
+    list sections share the source lists rather than copying them.
+    
+    Args:
+        page_type: Value for the output 'page_type' key
+        sections: (section key, source key, str or list) in output order
+        
+    Returns:
+        Function mapping a source dictionary to the page structure
+    """
+    lines = [
+        "def build(data):",
+        "    get = data.get",
+        "    return {",
+        f"        'page_type': {page_type!r},",
+        "        'sections': {",
+    ]
+    for section_key, source_key, kind in sections:
+        default = '""' if kind is str else "[]"
+        lines.append(f"            {section_key!r}: {_CONVERTERS[kind]}(get({source_key!r}, {default})),")
+    lines += ["        }", "    }"]
+    
+    namespace: Dict[str, Any] = {"_s": _s, "_l": _l}
+    exec(compile("\n".join(lines), f"<{page_type} page builder>", "exec"), namespace)
+    return namespace["build"]
+
+
+# Keys ProductTemplate.build requires in product_data (checked in one set operation)
+_PRODUCT_REQUIRED = frozenset(("name", "benefits", "how_to_use", "key_ingredients", "price"))
 
 
 class FAQTemplate:
@@ -26,20 +77,20 @@ class FAQTemplate:
         Raises:
             ValueError: If required fields are missing
         """
-        validated_faqs = []
         for idx, q in enumerate(questions):
             if "question" not in q:
                 raise ValueError(f"Question at index {idx} missing 'question' field")
             if "answer" not in q:
                 raise ValueError(f"Question at index {idx} missing 'answer' field")
-            validated_faqs.append({
-                "question": str(q["question"]),
-                "answer": str(q["answer"])
-            })
         
+        # Keys are known present, so the items are built in one comprehension
+        # with the same str fast path as the generated ProductTemplate builder
         return {
             "page_type": "faq",
-            "faqs": validated_faqs
+            "faqs": [
+                {"question": _s(q["question"]), "answer": _s(q["answer"])}
+                for q in questions
+            ]
         }
 
 
@@ -48,6 +99,18 @@ class ProductTemplate:
     
     page_type: str = "product"
     
+    # (section key, product_data key, type) in output order
+    sections: Tuple[Tuple[str, str, type], ...] = (
+        ("name", "name", str),
+        ("description", "description", str),  # LLM-generated description
+        ("concentration", "concentration", str),  # Product concentration
+        ("benefits", "benefits", list),
+        ("usage", "how_to_use", str),
+        ("ingredients", "key_ingredients", list),
+        ("price", "price", str),
+        ("warnings", "side_effects", str),
+    )
+    
     @staticmethod
     def build(product_data: Dict) -> Dict[str, Any]:
         """
@@ -62,24 +125,18 @@ class ProductTemplate:
         Raises:
             ValueError: If required fields are missing
         """
-        required_fields = ["name", "benefits", "how_to_use", "key_ingredients", "price"]
-        for field in required_fields:
-            if field not in product_data:
-                raise ValueError(f"Missing required field: '{field}'")
+        missing = _PRODUCT_REQUIRED.difference(product_data)
+        if missing:
+            fields = ", ".join(f"'{field}'" for field in sorted(missing))
+            raise ValueError(f"Missing required field(s): {fields}")
         
-        return {
-            "page_type": "product",
-            "sections": {
-                "name": str(product_data.get("name", "")),
-                "description": str(product_data.get("description", "")),  # LLM-generated description
-                "concentration": str(product_data.get("concentration", "")),  # Product concentration
-                "benefits": list(product_data.get("benefits", [])),
-                "usage": str(product_data.get("how_to_use", "")),
-                "ingredients": list(product_data.get("key_ingredients", [])),
-                "price": str(product_data.get("price", "")),
-                "warnings": str(product_data.get("side_effects", ""))
-            }
-        }
+        return ProductTemplate._build(product_data)
+
+
+# Specialized once at import from the declared section layout
+ProductTemplate._build = staticmethod(
+    _compile_page_builder(ProductTemplate.page_type, ProductTemplate.sections)
+)
 
 
 class ComparisonTemplate:
@@ -92,6 +149,10 @@ class ComparisonTemplate:
         """
         Build a comparison page structure.
         
+        The page references the given dictionaries and metrics list rather
+        than copying them, so callers must pass dictionaries they own (for
+        example Product.model_dump(), not a shared Product.dump).
+        
         Args:
             product_a: First product dictionary
             product_b: Second product dictionary
@@ -110,15 +171,13 @@ class ComparisonTemplate:
         if not isinstance(comparison_metrics, list):
             raise ValueError("comparison_metrics must be a list")
         
-        validated_metrics = []
         for idx, metric in enumerate(comparison_metrics):
             if not isinstance(metric, dict):
                 raise ValueError(f"Metric at index {idx} must be a dictionary")
-            validated_metrics.append(dict(metric))
         
         return {
             "page_type": "comparison",
-            "products": [dict(product_a), dict(product_b)],
-            "comparison_metrics": validated_metrics
+            "products": [product_a, product_b],
+            "comparison_metrics": comparison_metrics
         }
 
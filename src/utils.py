@@ -5,68 +5,257 @@ This module contains helper functions and utilities used across the content gene
 """
 
 import json
+import mmap
 import os
+import secrets
+import time
+import orjson
 from pathlib import Path
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
 
 
-def write_json_output(data: Dict, filename: str, output_dir: str = "output/") -> None:
+# Files at least this large are parsed from a memory map instead of a read() copy
+_MMAP_THRESHOLD = 64 * 1024
+
+# Largest single os.write() issued by _atomic_write_bytes
+_WRITE_CHUNK = 10 * 1024 * 1024
+
+# Flags for _atomic_write_bytes temporary files: never reuse an existing file
+_TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+# orjson options for indented output files (newline-terminated like text files)
+_INDENTED_JSON = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+# JSONLWriter buffers records until this many bytes are pending
+_JSONL_FLUSH = 1 << 20
+
+# Directories already created by ensure_directory in this process
+_CREATED_DIRS: Set[str] = set()
+
+
+def _recreate_parent(filepath: str) -> None:
+    """Recreate a file's parent directory that was removed after ensure_directory cached it."""
+    directory = os.path.dirname(filepath)
+    if not directory:
+        raise FileNotFoundError(f"Working directory no longer exists for {filepath}")
+    _CREATED_DIRS.discard(os.path.normpath(directory))
+    ensure_directory(directory)
+
+
+def _open_temp(filepath: str) -> Tuple[int, str]:
+    """
+    Create a uniquely named temporary file next to filepath.
+    
+    Opened with mode 0666 so the kernel applies the process umask, giving
+    the file the same permissions a plain open() would.
+    """
+    directory, name = os.path.split(filepath)
+    tmp_path = os.path.join(directory or ".", f".{name}.{secrets.token_hex(8)}.tmp")
+    return os.open(tmp_path, _TEMP_FLAGS, 0o666), tmp_path
+
+
+def _atomic_write_bytes(filepath: str, data: bytes) -> None:
+    """
+    Write bytes to a file atomically.
+    
+    The data goes to a temporary file in the same directory with unbuffered
+    os.write() calls and is then renamed over the target, so readers never
+    see a partially written file.
+    
+    Args:
+        filepath: Destination file path
+        data: Bytes to write
+    """
+    try:
+        fd, tmp_path = _open_temp(filepath)
+    except FileNotFoundError:
+        _recreate_parent(filepath)
+        fd, tmp_path = _open_temp(filepath)
+    try:
+        with memoryview(data) as view:
+            offset = 0
+            while offset < len(view):
+                offset += os.write(fd, view[offset:offset + _WRITE_CHUNK])
+        os.close(fd)
+        fd = -1
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if fd != -1:
+            os.close(fd)
+        os.unlink(tmp_path)
+        raise
+
+
+class JSONLWriter:
+    """
+    Append JSON records to a JSON-lines file, one compact object per line.
+    
+    Records are serialized with orjson into an in-memory buffer that is
+    written with a single os.write() once it passes _JSONL_FLUSH bytes and
+    again on close, so many pages share one open file and few syscalls.
+    """
+    
+    def __init__(self, filepath: str):
+        """
+        Open (or create) the file for appending.
+        
+        Args:
+            filepath: Path to the JSONL file
+        """
+        self.filepath = filepath
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        try:
+            self._fd = os.open(filepath, flags, 0o666)
+        except FileNotFoundError:
+            _recreate_parent(filepath)
+            self._fd = os.open(filepath, flags, 0o666)
+        self._buffer = bytearray()
+    
+    def write(self, record: Any) -> None:
+        """
+        Buffer one record as a line of JSON.
+        
+        Args:
+            record: JSON-serializable value
+            
+        Raises:
+            ValueError: If record is not JSON-serializable
+        """
+        try:
+            self._buffer += orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError as e:
+            raise ValueError(f"Data is not JSON-serializable: {e}")
+        if len(self._buffer) >= _JSONL_FLUSH:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered records to the file."""
+        with memoryview(self._buffer) as view:
+            offset = 0
+            while offset < len(view):
+                offset += os.write(self._fd, view[offset:offset + _WRITE_CHUNK])
+        self._buffer.clear()
+    
+    def close(self) -> None:
+        """Flush pending records and close the file; safe to call twice."""
+        if self._fd == -1:
+            return
+        try:
+            self.flush()
+        finally:
+            os.close(self._fd)
+            self._fd = -1
+    
+    def __enter__(self) -> "JSONLWriter":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_json_output(data: Dict, filename: str, output_dir: str = "output/", jsonl: bool = False) -> None:
     """
     Write data to a JSON file with proper formatting.
     
+    Serializes once with orjson (UTF-8 bytes, 2-space indent, trailing
+    newline) and writes the bytes to a temporary file that atomically
+    replaces the target, with no text-layer re-encoding.
+    With jsonl=True the data is instead appended as one compact line (see
+    write_jsonl_output, which batches should call directly).
+    
     Args:
         data: Dictionary data to write (must be JSON-serializable)
         filename: Name of the output file
         output_dir: Directory for output files (default: "output/")
+        jsonl: Append to a JSON-lines file instead of replacing a JSON file
         
     Raises:
         ValueError: If data is not JSON-serializable
         IOError: If file cannot be written
     """
+    if jsonl:
+        write_jsonl_output((data,), filename, output_dir)
+        return
+    
     try:
-        # Validate data is JSON-serializable
-        json.dumps(data)
-    except (TypeError, ValueError) as e:
+        data_bytes = orjson.dumps(data, option=_INDENTED_JSON)
+    except TypeError as e:
         raise ValueError(f"Data is not JSON-serializable: {e}")
     
     try:
         # Create output_dir if it doesn't exist
         ensure_directory(output_dir)
         
-        # Build full file path
-        filepath = os.path.join(output_dir, filename)
-        
-        # Write data to JSON file with proper formatting
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Write serialized bytes to the output file in one atomic replace
+        _atomic_write_bytes(str(Path(output_dir, filename)), data_bytes)
             
     except IOError as e:
         raise IOError(f"Failed to write file {filename}: {e}")
 
 
+def write_jsonl_output(records: Iterable[Any], filename: str, output_dir: str = "output/") -> None:
+    """
+    Append records to a JSON-lines file, one compact line each.
+    
+    All records go through a single JSONLWriter, so a whole batch of pages
+    costs one open/close and a few buffered writes rather than one round
+    of syscalls per page.
+    
+    Args:
+        records: JSON-serializable records to append, in order
+        filename: Name of the output file
+        output_dir: Directory for output files (default: "output/")
+        
+    Raises:
+        ValueError: If a record is not JSON-serializable
+        IOError: If file cannot be written
+    """
+    try:
+        ensure_directory(output_dir)
+        with JSONLWriter(str(Path(output_dir, filename))) as writer:
+            for record in records:
+                writer.write(record)
+    except IOError as e:
+        raise IOError(f"Failed to write file {filename}: {e}")
+
+
 def ensure_directory(directory: str) -> None:
     """
     Create directory if it doesn't exist.
     
+    Directories created once are remembered, so repeated calls for the
+    same path skip the makedirs syscalls; the writers recreate a remembered
+    directory that has since been removed.
+    
     Args:
         directory: Directory path to create
     """
-    Path(directory).mkdir(parents=True, exist_ok=True)
+    directory = os.path.normpath(directory)
+    if directory in _CREATED_DIRS:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _CREATED_DIRS.add(directory)
 
 
 def load_json(filepath: str) -> Dict[str, Any]:
     """
     Load JSON data from a file.
     
+    Large files are memory-mapped and parsed in place, so the raw bytes are
+    never copied into a Python buffer; small files are read directly, where
+    mapping setup would cost more than it saves.
+    
     Args:
         filepath: Path to the JSON file
         
     Returns:
         Parsed JSON data as a dictionary
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
 
 
 def load_dataset(file_path: str) -> Dict[str, Any]:
@@ -130,14 +319,26 @@ def save_json(data: Dict[str, Any], filepath: str, indent: int = 2) -> None:
     """
     Save data to a JSON file.
     
+    The default 2-space indent is serialized with orjson; other indents
+    fall back to the standard library encoder. The file is replaced atomically.
+    On the orjson path NaN and Infinity are written as null (strict JSON)
+    rather than the stdlib's NaN/Infinity tokens, and non-str keys are
+    stringified.
+    
     Args:
         data: Data to save
         filepath: Path to the output file
         indent: JSON indentation level
     """
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=indent, ensure_ascii=False)
+    # Bare filenames go to the working directory, which already exists
+    directory = os.path.dirname(filepath)
+    if directory:
+        ensure_directory(directory)
+    if indent == 2:
+        data_bytes = orjson.dumps(data, option=_INDENTED_JSON)
+    else:
+        data_bytes = (json.dumps(data, indent=indent, ensure_ascii=False) + "\n").encode('utf-8')
+    _atomic_write_bytes(filepath, data_bytes)
 
 
 def generate_timestamp() -> str:
@@ -147,7 +348,9 @@ def generate_timestamp() -> str:
     Returns:
         Formatted timestamp string
     """
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Local time, formatted directly from struct_time (no datetime or strftime)
+    t = time.localtime()
+    return f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}"
 
 
 def validate_config(config: Dict[str, Any], required_keys: list) -> bool:
@@ -161,4 +364,5 @@ def validate_config(config: Dict[str, Any], required_keys: list) -> bool:
     Returns:
         True if all required keys are present, False otherwise
     """
-    return all(key in config for key in required_keys)
+    # One C-level subset check instead of a per-key generator loop
+    return set(required_keys).issubset(config)
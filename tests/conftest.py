@@ -5,8 +5,9 @@ Provides mocked LLM client and test data fixtures.
 """
 
 import pytest
+from types import MappingProxyType
 from unittest.mock import MagicMock
-from typing import Dict, Any
+from typing import Any, Dict, List, Tuple
 
 
 @pytest.fixture
@@ -26,10 +27,10 @@ def mock_llm_client():
     return mock
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_product_data():
-    """Provide sample product data for tests (not hardcoded in code)."""
-    return {
+    """Provide read-only sample product data for tests (not hardcoded in code)."""
+    return MappingProxyType({
         "name": "Test Vitamin C Serum",
         "concentration": "10% Vitamin C",
         "skin_type": ["Oily", "Combination"],
@@ -38,7 +39,14 @@ def sample_product_data():
         "how_to_use": "Apply 2-3 drops in the morning before sunscreen",
         "side_effects": "Mild tingling for sensitive skin",
         "price": "₹699"
-    }
+    })
+
+
+@pytest.fixture(scope="session")
+def sample_product(sample_product_data):
+    """Provide one Product built from the sample data (frozen, so safe to share)."""
+    from src.models.schemas import Product
+    return Product(**sample_product_data)
 
 
 @pytest.fixture
@@ -50,6 +58,57 @@ def mock_faq_response():
     ]
 
 
+class FakeLLM:
+    """
+    Minimal stand-in for LLMClient.generate_json.
+    
+    Returns whatever is in payload and records each call's arguments,
+    without MagicMock's per-attribute child mock creation.
+    """
+    
+    def __init__(self, payload: Any = None):
+        self.payload = payload
+        self.calls: List[Tuple[tuple, Dict[str, Any]]] = []
+    
+    def generate_json(self, *args, **kwargs) -> Any:
+        self.calls.append((args, kwargs))
+        return self.payload
+
+
+@pytest.fixture
+def workflow_llm(monkeypatch):
+    """Route the workflow nodes' get_llm_client() to a fresh FakeLLM."""
+    fake = FakeLLM()
+    monkeypatch.setattr("src.graph.workflow.get_llm_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture(scope="session")
+def compiled_workflow():
+    """
+    Provide the compiled LangGraph workflow for the whole test session.
+    
+    Returns the module singleton that AgentOrchestrator also uses, so the
+    graph is compiled once per session rather than once per consumer.
+    """
+    from src.graph.workflow import content_workflow
+    return content_workflow
+
+
+@pytest.fixture(scope="session")
+def shared_orchestrator():
+    """Construct one AgentOrchestrator for the whole test session."""
+    from src.orchestrator import AgentOrchestrator
+    return AgentOrchestrator()
+
+
+@pytest.fixture
+def orchestrator(shared_orchestrator):
+    """Provide the shared orchestrator, clearing its last state after each test."""
+    yield shared_orchestrator
+    shared_orchestrator.reset()
+
+
 @pytest.fixture(autouse=True)
 def reset_llm_client():
     """Reset LLM client before each test."""
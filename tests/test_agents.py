@@ -5,7 +5,8 @@ Unit tests for the agent classes in the content generation system.
 """
 
 import pytest
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Any, List, Mapping
 
 from src.agents.base_agent import BaseAgent
 from src.agents.parser_agent import DataParserAgent
@@ -16,8 +17,8 @@ from src.agents.comparison_agent import ComparisonAgent
 from src.models.schemas import Product
 
 
-# Sample product data for tests
-SAMPLE_PRODUCT_DATA: Dict[str, Any] = {
+# Sample product data for tests (read-only so no test can leak changes into another)
+SAMPLE_PRODUCT_DATA: Mapping[str, Any] = MappingProxyType({
     "name": "Test Vitamin C Serum",
     "concentration": "10% Vitamin C",
     "skin_type": ["Oily", "Combination"],
@@ -26,7 +27,7 @@ SAMPLE_PRODUCT_DATA: Dict[str, Any] = {
     "how_to_use": "Apply 2-3 drops in the morning",
     "side_effects": "Mild tingling for sensitive skin",
     "price": "₹699"
-}
+})
 
 
 class TestDataParserAgent:
@@ -191,3 +192,12 @@ class TestAgentDependencyChain:
         completed = ["parser", "questions"]
         
         assert faq.can_execute(completed) is True
+    
+    def test_can_execute_accepts_completed_set(self):
+        """Test that can_execute works with a frozenset of completed agents."""
+        faq = FAQGenerationAgent()
+        product = ProductPageAgent()
+        
+        assert faq.can_execute(frozenset({"parser"})) is False
+        assert faq.can_execute(frozenset({"parser", "questions"})) is True
+        assert product.can_execute(frozenset({"parser"})) is True
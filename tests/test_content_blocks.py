@@ -18,8 +18,8 @@ from src.content_blocks.generators import (
 from src.models.schemas import Product
 
 
-# Sample products for testing
-@pytest.fixture
+# Sample products for testing (Product is frozen, so one instance per module is shared)
+@pytest.fixture(scope="module")
 def sample_product_a() -> Product:
     """Create sample product A for testing."""
     return Product(
@@ -34,7 +34,7 @@ def sample_product_a() -> Product:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_product_b() -> Product:
     """Create sample product B for testing."""
     return Product(
@@ -5,110 +5,134 @@ Tests the end-to-end workflow and LangGraph integration.
 Uses mocked LLM to avoid actual API calls during testing.
 """
 
+import subprocess
+import sys
+import threading
 import pytest
+from types import MappingProxyType
 from typing import Dict, Any
 from unittest.mock import patch, MagicMock
 
 from src.orchestrator import AgentOrchestrator
+from src.graph import workflow as wf
+from src.graph.state import ContentGenerationState
+from src.graph.workflow import (
+    content_workflow,
+    create_workflow,
+    parse_product,
+    generate_questions,
+    generate_comparison_page
+)
 from src.templates.template_definitions import FAQTemplate, ProductTemplate, ComparisonTemplate
-from src.models.schemas import Product, Question
+from src.models.schemas import Product, ProductPageContent, Question
+from src.validators import validate_faq_count, validate_output_schema
+
+
+# Template inputs built once at import; the templates never mutate their inputs
+_FAQ_ITEMS = (
+    {"question": "Q1?", "answer": "A1."},
+    {"question": "Q2?", "answer": "A2."}
+)
+
+_PRODUCT_TEMPLATE_INPUT = MappingProxyType({
+    "name": "Test Product",
+    "description": "A test product",
+    "concentration": "10%",
+    "benefits": ["Benefit 1", "Benefit 2"],
+    "how_to_use": "Use daily",
+    "key_ingredients": ["Ingredient 1"],
+    "price": "₹500",
+    "side_effects": "None"
+})
+
+# Keys every built page is expected to contain
+_EXPECTED_FAQ_ITEM_KEYS = frozenset({"question", "answer"})
+_EXPECTED_PRODUCT_SECTION_KEYS = frozenset({"name", "benefits", "usage", "ingredients", "price"})
+
+# ComparisonTemplate type-checks for dict and list, so these stay mutable types
+_COMPARISON_PRODUCT_A = {"name": "Product A", "price": "₹500"}
+_COMPARISON_PRODUCT_B = {"name": "Product B", "price": "₹600"}
+_COMPARISON_METRICS = [{"difference": "₹100"}]
 
 
 class TestTemplates:
     """Tests for template classes."""
     
-    def test_faq_template_build(self):
-        """Test FAQTemplate builds valid output."""
-        questions = [
-            {"question": "What is this product?", "answer": "A Vitamin C serum."},
-            {"question": "How to use it?", "answer": "Apply 2-3 drops daily."}
-        ]
-        
-        result = FAQTemplate.build(questions)
-        
-        assert result["page_type"] == "faq"
-        assert "faqs" in result
-        assert len(result["faqs"]) == 2
-    
-    def test_faq_template_validates_fields(self):
-        """Test FAQTemplate raises error for missing fields."""
-        invalid_questions = [
-            {"question": "What?"}  # Missing 'answer'
-        ]
-        
-        with pytest.raises(ValueError) as excinfo:
-            FAQTemplate.build(invalid_questions)
-        
-        assert "missing 'answer' field" in str(excinfo.value)
+    @pytest.mark.parametrize("template_cls,args,expect_error,expected_page_type,check", [
+        pytest.param(FAQTemplate, (_FAQ_ITEMS,), None, "faq",
+                     lambda result: len(result["faqs"]) == 2, id="faq-build"),
+        pytest.param(FAQTemplate, (({"question": "What?"},),), "missing 'answer' field", None,
+                     None, id="faq-missing-answer"),
+        pytest.param(ProductTemplate, (_PRODUCT_TEMPLATE_INPUT,), None, "product",
+                     lambda result: result["sections"]["name"] == "Test Product", id="product-build"),
+        pytest.param(ProductTemplate, ({"name": "Test"},), "Missing required field", None,
+                     None, id="product-missing-fields"),
+        pytest.param(ComparisonTemplate, (_COMPARISON_PRODUCT_A, _COMPARISON_PRODUCT_B, _COMPARISON_METRICS),
+                     None, "comparison",
+                     lambda result: len(result["products"]) == 2 and "comparison_metrics" in result,
+                     id="comparison-build"),
+    ])
+    def test_template_build(self, template_cls, args, expect_error, expected_page_type, check):
+        """Test each template builds valid output or rejects inputs missing required fields."""
+        if expect_error is not None:
+            with pytest.raises(ValueError) as excinfo:
+                template_cls.build(*args)
+            
+            assert expect_error in str(excinfo.value)
+            return
+        
+        result = template_cls.build(*args)
+        
+        assert result["page_type"] == expected_page_type
+        assert check(result)
     
-    def test_product_template_build(self):
-        """Test ProductTemplate builds valid output."""
+    def test_product_template_converts_only_mismatched_types(self):
+        """Test ProductTemplate coerces non-str/non-list values and passes the rest through."""
+        benefits = ["Benefit 1"]
         product_data = {
             "name": "Test Product",
-            "description": "A test product",
-            "concentration": "10%",
-            "benefits": ["Benefit 1", "Benefit 2"],
+            "benefits": benefits,
             "how_to_use": "Use daily",
-            "key_ingredients": ["Ingredient 1"],
-            "price": "₹500",
-            "side_effects": "None"
+            "key_ingredients": ("Ingredient 1",),
+            "price": 500
         }
         
-        result = ProductTemplate.build(product_data)
-        
-        assert result["page_type"] == "product"
-        assert "sections" in result
-        assert result["sections"]["name"] == "Test Product"
-    
-    def test_product_template_validates_required_fields(self):
-        """Test ProductTemplate raises error for missing required fields."""
-        incomplete_data = {
-            "name": "Test"
-            # Missing: benefits, how_to_use, key_ingredients, price
-        }
+        sections = ProductTemplate.build(product_data)["sections"]
         
-        with pytest.raises(ValueError) as excinfo:
-            ProductTemplate.build(incomplete_data)
-        
-        assert "Missing required field" in str(excinfo.value)
-    
-    def test_comparison_template_build(self):
-        """Test ComparisonTemplate builds valid output."""
-        product_a = {"name": "Product A", "price": "₹500"}
-        product_b = {"name": "Product B", "price": "₹600"}
-        metrics = [{"difference": "₹100"}]
-        
-        result = ComparisonTemplate.build(product_a, product_b, metrics)
-        
-        assert result["page_type"] == "comparison"
-        assert "products" in result
-        assert len(result["products"]) == 2
-        assert "comparison_metrics" in result
+        assert sections["benefits"] is benefits
+        assert sections["ingredients"] == ["Ingredient 1"]
+        assert sections["price"] == "500"
+        assert sections["description"] == ""
 
 
 class TestOrchestratorInitialization:
     """Tests for AgentOrchestrator initialization."""
     
-    def test_orchestrator_creates_workflow(self):
-        """Test that orchestrator initializes with LangGraph workflow."""
-        orchestrator = AgentOrchestrator()
-        
-        assert orchestrator.workflow is not None
+    def test_orchestrator_creates_workflow(self, orchestrator, compiled_workflow):
+        """Test that orchestrator initializes with the shared compiled LangGraph workflow."""
+        assert orchestrator.workflow is compiled_workflow
         assert orchestrator._last_state == {}
     
-    def test_orchestrator_reset(self):
+    def test_importing_orchestrator_does_not_compile_workflow(self):
+        """Test that the workflow is compiled on first orchestrator use, not at import."""
+        code = (
+            "import sys, src.orchestrator, src.graph.workflow as wf; "
+            "print('content_workflow' in vars(wf), 'langgraph' in sys.modules)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        
+        assert result.stdout.split() == ["False", "False"]
+    
+    def test_orchestrator_reset(self, orchestrator):
         """Test that reset clears last state."""
-        orchestrator = AgentOrchestrator()
         orchestrator._last_state = {"test": "data"}
         
         orchestrator.reset()
         
         assert orchestrator._last_state == {}
     
-    def test_get_agent_status_initial(self):
+    def test_get_agent_status_initial(self, orchestrator):
         """Test initial agent status before execution."""
-        orchestrator = AgentOrchestrator()
-        
         status = orchestrator.get_agent_status()
         
         assert status["parser"] == "pending"
@@ -116,6 +140,32 @@ class TestOrchestratorInitialization:
         assert status["faq"] == "pending"
         assert status["product"] == "pending"
         assert status["comparison"] == "pending"
+    
+    def test_execute_batch_passes_states_and_concurrency_limit(self):
+        """Test that execute_batch builds one state per product and collects outputs in order."""
+        orchestrator = AgentOrchestrator()
+        orchestrator.workflow = MagicMock()
+        orchestrator.workflow.batch.return_value = [
+            {"faq_output": {"id": 1}, "product_output": {"id": 1}, "comparison_output": {"id": 1}},
+            {"faq_output": {"id": 2}, "product_output": {"id": 2}, "comparison_output": {"id": 2}},
+        ]
+        
+        results = orchestrator.execute_batch([{"name": "A"}, {"name": "B"}], parallelism=2)
+        
+        assert [r["faq"]["id"] for r in results] == [1, 2]
+        states, = orchestrator.workflow.batch.call_args.args
+        assert states == [{"raw_input": {"name": "A"}}, {"raw_input": {"name": "B"}}]
+        assert orchestrator.workflow.batch.call_args.kwargs == {
+            "config": {"max_concurrency": 2},
+            "return_exceptions": True
+        }
+    
+    def test_execute_batch_reports_failures_per_product(self, orchestrator):
+        """Test that one invalid product yields its exception without failing the batch."""
+        results = orchestrator.execute_batch([{"name": "Missing every other field"}], parallelism=1)
+        
+        assert len(results) == 1
+        assert isinstance(results[0], Exception)
 
 
 class TestLangGraphWorkflow:
@@ -123,25 +173,19 @@ class TestLangGraphWorkflow:
     
     def test_workflow_imports(self):
         """Test that LangGraph workflow can be imported."""
-        from src.graph.workflow import content_workflow, create_workflow
-        
         assert content_workflow is not None
         assert create_workflow is not None
     
     def test_state_type_imports(self):
         """Test that state types can be imported."""
-        from src.graph.state import ContentGenerationState
-        
         assert ContentGenerationState is not None
     
-    def test_workflow_has_nodes(self):
+    def test_workflow_has_nodes(self, compiled_workflow):
         """Test that workflow has expected nodes."""
-        from src.graph.workflow import create_workflow
-        
-        workflow = create_workflow()
-        
         # LangGraph compiled graph should exist
-        assert workflow is not None
+        assert compiled_workflow is not None
+        assert {"parse_product", "generate_questions", "generate_product_page",
+                "generate_comparison_page"} <= compiled_workflow.nodes.keys()
 
 
 class TestSchemaValidation:
@@ -155,14 +199,65 @@ class TestSchemaValidation:
         assert product.concentration == "10% Vitamin C"
         assert len(product.skin_type) == 2
     
-    def test_product_schema_model_dump(self, sample_product_data):
+    def test_product_schema_model_dump(self, sample_product, sample_product_data):
         """Test Product schema model_dump method."""
-        product = Product(**sample_product_data)
+        # One comparison against the source data covers every field
+        assert sample_product.model_dump() == dict(sample_product_data)
+    
+    def test_product_is_frozen(self, sample_product):
+        """Test that Product instances are immutable."""
+        with pytest.raises(AttributeError):
+            sample_product.name = "Changed"
+    
+    def test_product_from_dict_validate_rejects_bad_types(self, sample_product_data):
+        """Test that opt-in validation rejects wrongly typed fields."""
+        bad_data = dict(sample_product_data, skin_type="Oily")
+        
+        with pytest.raises(ValueError):
+            Product.from_dict(bad_data, validate=True)
+    
+    def test_product_from_dict_ignores_extra_keys(self, sample_product_data):
+        """Test that from_dict drops unknown keys (e.g., from LLM output)."""
+        product = Product.from_dict(dict(sample_product_data, rating="5 stars"))
         
-        data = product.model_dump()
+        assert product.name == "Test Vitamin C Serum"
+        assert "rating" not in product.model_dump()
+    
+    def test_product_joined_fields_are_cached(self, sample_product):
+        """Test that joined display strings are computed once and not dumped."""
+        assert sample_product.skin_type_csv == "Oily, Combination"
+        assert sample_product.skin_type_csv is sample_product.skin_type_csv
+        assert "skin_type_csv" not in sample_product.model_dump()
+    
+    def test_product_dump_is_cached(self, sample_product):
+        """Test that Product.dump is computed once and matches model_dump."""
+        assert sample_product.dump is sample_product.dump
+        assert sample_product.dump == sample_product.model_dump()
+    
+    def test_product_view_is_read_only(self, sample_product):
+        """Test that Product.view exposes the dump without allowing writes."""
+        assert sample_product.view["price"] == sample_product.price
+        with pytest.raises(TypeError):
+            sample_product.view["price"] = "free"
+    
+    def test_product_page_content_defaults_omitted_fields(self):
+        """Test ProductPageContent parses LLM JSON and leaves omitted fields None."""
+        content = ProductPageContent.model_validate_json(
+            '{"description": "Bright serum", "benefits_section": ["Glow"], "extra": 1}'
+        )
+        
+        assert content.description == "Bright serum"
+        assert content.benefits_section == ["Glow"]
+        assert content.usage_section is None
+    
+    def test_product_page_content_accepts_list_sections(self):
+        """Test that list-valued usage and safety sections validate instead of failing the call."""
+        content = ProductPageContent.model_validate_json(
+            '{"usage_section": ["Cleanse", "Apply 2-3 drops"], "safety_section": ["Patch test first"]}'
+        )
         
-        assert isinstance(data, dict)
-        assert data["name"] == "Test Vitamin C Serum"
+        assert content.usage_section == ["Cleanse", "Apply 2-3 drops"]
+        assert content.safety_section == ["Patch test first"]
     
     def test_question_schema_valid(self):
         """Test Question schema with valid data."""
@@ -180,11 +275,8 @@ class TestSchemaValidation:
 class TestMockedWorkflowExecution:
     """Tests for workflow execution with mocked LLM."""
     
-    @patch('src.graph.workflow.get_llm_client')
-    def test_parse_product_node(self, mock_get_llm, sample_product_data):
+    def test_parse_product_node(self, sample_product_data):
         """Test parse_product node function."""
-        from src.graph.workflow import parse_product
-        
         state = {"raw_input": sample_product_data}
         result = parse_product(state)
         
@@ -192,87 +284,143 @@ class TestMockedWorkflowExecution:
         assert isinstance(result["parsed_product"], Product)
         assert result["parsed_product"].name == "Test Vitamin C Serum"
     
-    @patch('src.graph.workflow.get_llm_client')
-    @patch('src.graph.workflow._delay_for_rate_limit')
-    def test_generate_questions_node(self, mock_delay, mock_get_llm, sample_product_data, mock_llm_client):
+    def test_generate_questions_node(self, sample_product, workflow_llm):
         """Test generate_questions node with mocked LLM."""
-        from src.graph.workflow import generate_questions
-        
         # Setup mock
-        mock_get_llm.return_value = mock_llm_client
-        mock_llm_client.generate_json.return_value = [
-            {"id": "q1", "text": "What is this?", "category": "INFORMATIONAL"},
-            {"id": "q2", "text": "Is it safe?", "category": "SAFETY"}
-        ]
+        workflow_llm.payload = {"questions": [
+            {"id": "q1", "text": "What is this?", "category": "INFORMATIONAL", "answer": "A serum."},
+            {"id": "q2", "text": "Is it safe?", "category": "SAFETY", "answer": "Yes."}
+        ]}
         
-        product = Product(**sample_product_data)
-        state = {"parsed_product": product}
+        state = {"parsed_product": sample_product}
         
         result = generate_questions(state)
         
         assert "questions" in result
         assert len(result["questions"]) == 2
-        mock_llm_client.generate_json.assert_called_once()
+        assert len(workflow_llm.calls) == 1
     
-    @patch('src.graph.workflow.get_llm_client')
-    @patch('src.graph.workflow._delay_for_rate_limit')
-    def test_generate_faq_node(self, mock_delay, mock_get_llm, sample_product_data, mock_faq_response):
-        """Test generate_faq_page node with mocked LLM."""
-        from src.graph.workflow import generate_faq_page
-        from unittest.mock import MagicMock
-        
+    def test_generate_questions_node_builds_faq(self, sample_product, workflow_llm, mock_faq_response):
+        """Test that generate_questions answers its questions in the same LLM call."""
         # Setup mock
-        mock_llm = MagicMock()
-        mock_get_llm.return_value = mock_llm
-        mock_llm.generate_json.return_value = mock_faq_response
+        workflow_llm.payload = {"questions": [
+            {"id": f"q{i}", "text": item["question"], "category": "USAGE", "answer": item["answer"]}
+            for i, item in enumerate(mock_faq_response, start=1)
+        ]}
         
-        product = Product(**sample_product_data)
-        questions = [
-            Question(id="q1", text="What is this?", category="INFORMATIONAL"),
-            Question(id="q2", text="How to use?", category="USAGE")
-        ]
-        state = {"parsed_product": product, "questions": questions}
+        state = {"parsed_product": sample_product}
         
-        result = generate_faq_page(state)
+        result = generate_questions(state)
         
         assert "faq_output" in result
         assert result["faq_output"]["page_type"] == "faq"
+        assert result["faq_output"]["faqs"] == mock_faq_response
+        assert result["questions"][0].answer == "Answer 1."
+        assert len(workflow_llm.calls) == 1
+    
+    def test_questions_response_check_requires_full_faq(self):
+        """Test that a questions response too short for the FAQ page is rejected."""
+        short = {"questions": [{"id": "q1", "text": "Q?", "category": "USAGE", "answer": "A."}]}
+        full = {"questions": short["questions"] * 15}
+        
+        with pytest.raises(ValueError):
+            wf._check_questions_response(short)
+        wf._check_questions_response(full)  # Should not raise
+    
+    def test_generate_comparison_node_single_call(self, sample_product, workflow_llm):
+        """Test that competitor and comparison come from one LLM call."""
+        workflow_llm.payload = {
+            "product_b": {"name": "Rival Serum", "price": "₹899"},
+            "comparison": {"recommendation": "Choose A for oily skin."}
+        }
+        
+        state = {"parsed_product": sample_product}
+        result = generate_comparison_page(state)
+        
+        output = result["comparison_output"]
+        product_b = output["products"][1]
+        assert product_b["name"] == "Rival Serum"
+        # Fields the LLM omitted fall back to the default competitor
+        assert product_b["concentration"] == "15% Vitamin C"
+        assert output["comparison_metrics"] == [{"recommendation": "Choose A for oily skin."}]
+        assert len(workflow_llm.calls) == 1
+    
+    def test_comparison_page_does_not_share_product_dump(self, sample_product, workflow_llm):
+        """Test that mutating the comparison page leaves the Product's cached dump intact."""
+        workflow_llm.payload = {"product_b": {"name": "Rival Serum"}, "comparison": {"note": "x"}}
+        
+        output = generate_comparison_page({"parsed_product": sample_product})["comparison_output"]
+        output["products"][0]["name"] = "Changed"
+        output["products"][0]["benefits"].append("Changed")
+        
+        assert sample_product.view["name"] != "Changed"
+        assert "Changed" not in sample_product.dump["benefits"]
+        assert "Changed" not in sample_product.benefits
+    
+    def test_llm_nodes_share_prompt_prefix(self, sample_product, workflow_llm):
+        """Test that node prompts share the system prompt and product block prefix."""
+        workflow_llm.payload = {"questions": []}
+        generate_questions({"parsed_product": sample_product})
+        workflow_llm.payload = {}
+        generate_comparison_page({"parsed_product": sample_product})
+        
+        (q_system, q_user), q_kwargs = workflow_llm.calls[0]
+        (c_system, c_user), c_kwargs = workflow_llm.calls[1]
+        assert q_system == c_system
+        # The shared system prompt means the cache must be told the tasks apart
+        assert q_kwargs["cache_namespace"] != c_kwargs["cache_namespace"]
+        q_prefix, q_task = q_user.split("---TASK---")
+        c_prefix, c_task = c_user.split("---TASK---")
+        assert q_prefix == c_prefix
+        assert sample_product.context_block in q_prefix
+        assert q_task != c_task
+    
+    def test_fan_out_nodes_run_concurrently(self, sample_product_data):
+        """Test that the three post-parse nodes overlap under sync invoke."""
+        # Each node blocks until all three have started; serial execution times out
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def fan_out_node(state):
+            barrier.wait()
+            return {}
+        
+        with patch.object(wf, "generate_questions", fan_out_node), \
+                patch.object(wf, "generate_product_page", fan_out_node), \
+                patch.object(wf, "generate_comparison_page", fan_out_node):
+            graph = wf.create_workflow()
+        
+        final_state = graph.invoke({"raw_input": sample_product_data})
+        
+        assert final_state["parsed_product"].name == "Test Vitamin C Serum"
+
+
+@pytest.fixture(scope="module")
+def built_faq():
+    """Build the FAQ page from the shared FAQ items once per module."""
+    return FAQTemplate.build(_FAQ_ITEMS)
+
+
+@pytest.fixture(scope="module")
+def built_product():
+    """Build the product page from the shared template input once per module."""
+    return ProductTemplate.build(_PRODUCT_TEMPLATE_INPUT)
 
 
 class TestOutputStructure:
     """Tests for output structure validation."""
     
-    def test_faq_output_structure(self):
+    def test_faq_output_structure(self, built_faq):
         """Test that FAQ output has expected structure."""
-        faq_items = [
-            {"question": "Q1?", "answer": "A1."},
-            {"question": "Q2?", "answer": "A2."}
-        ]
-        
-        output = FAQTemplate.build(faq_items)
-        
-        assert "page_type" in output
-        assert output["page_type"] == "faq"
-        assert "faqs" in output
-        for faq in output["faqs"]:
-            assert "question" in faq
-            assert "answer" in faq
+        assert "page_type" in built_faq
+        assert built_faq["page_type"] == "faq"
+        assert "faqs" in built_faq
+        assert all(_EXPECTED_FAQ_ITEM_KEYS <= faq.keys() for faq in built_faq["faqs"])
     
-    def test_product_output_structure(self, sample_product_data):
+    def test_product_output_structure(self, built_product):
         """Test that product output has expected structure."""
-        product_data = sample_product_data.copy()
-        product_data["description"] = "A great product"
-        
-        output = ProductTemplate.build(product_data)
-        
-        assert output["page_type"] == "product"
-        assert "sections" in output
-        sections = output["sections"]
-        assert "name" in sections
-        assert "benefits" in sections
-        assert "usage" in sections
-        assert "ingredients" in sections
-        assert "price" in sections
+        assert built_product["page_type"] == "product"
+        assert "sections" in built_product
+        assert _EXPECTED_PRODUCT_SECTION_KEYS <= built_product["sections"].keys()
 
 
 class TestOutputValidation:
@@ -280,8 +428,6 @@ class TestOutputValidation:
     
     def test_faq_count_validation(self, mock_faq_response):
         """Test that FAQ count validation enforces minimum 15 FAQs."""
-        from src.validators import validate_faq_count
-        
         # Valid FAQ (15 questions)
         valid_faq = FAQTemplate.build(mock_faq_response)
         validate_faq_count(valid_faq)  # Should not raise
@@ -289,7 +435,6 @@ class TestOutputValidation:
         # Invalid FAQ (less than 15 questions)
         invalid_faq = FAQTemplate.build(mock_faq_response[:10])
         
-        import pytest
         with pytest.raises(ValueError) as excinfo:
             validate_faq_count(invalid_faq)
         
@@ -298,8 +443,6 @@ class TestOutputValidation:
     
     def test_output_schema_validation(self):
         """Test output schema validation."""
-        from src.validators import validate_output_schema
-        
         # Valid FAQ output
         valid_faq = {
             "page_type": "faq",
@@ -308,7 +451,6 @@ class TestOutputValidation:
         validate_output_schema(valid_faq, "faq")  # Should not raise
         
         # Invalid FAQ output (wrong page_type)
-        import pytest
         with pytest.raises(ValueError) as excinfo:
             validate_output_schema({"page_type": "product"}, "faq")
         
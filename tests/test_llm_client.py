@@ -0,0 +1,301 @@
+"""
+Tests for LLM Client Module
+
+Unit tests for the LLM response cache and helpers. No API key or network access required.
+"""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+
+from src.llm_client import LLMClient, ResponseCache, JSONStreamScanner, TokenBucket, _repair_json, _retry_after_seconds
+
+
+@pytest.fixture
+def streaming_client():
+    """Provide an LLMClient whose Groq client returns a canned chunk stream."""
+    client = LLMClient.__new__(LLMClient)  # skip API key and network setup
+    client.model = "test-model"
+    client.limiter = TokenBucket(interval=0, capacity=1)
+    client._call_slots = threading.BoundedSemaphore(1)
+    
+    deltas = ['{"a": ', '1}', ' trailing prose']
+    stream = MagicMock()
+    stream.__iter__.return_value = iter([
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))]) for d in deltas
+    ])
+    client.client = MagicMock()
+    client.client.chat.completions.create.return_value = stream
+    return client, stream
+
+
+@pytest.fixture
+def json_client(tmp_path, monkeypatch):
+    """Provide an LLMClient with a temporary cache whose Groq client returns queued contents."""
+    monkeypatch.setattr("src.llm_client.time.sleep", lambda seconds: None)
+    client = LLMClient.__new__(LLMClient)  # skip API key and network setup
+    client.model = "test-model"
+    client.limiter = TokenBucket(interval=0, capacity=1)
+    client._call_slots = threading.BoundedSemaphore(1)
+    client.cache = ResponseCache(str(tmp_path / "llm_cache"))
+    client.client = MagicMock()
+    
+    def queue(*contents):
+        client.client.chat.completions.create.side_effect = [
+            SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=c))]) for c in contents
+        ]
+    
+    yield client, queue
+    client.cache.clear()
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    """Provide an exact-match cache backed by a temporary directory."""
+    cache = ResponseCache(str(tmp_path / "llm_cache"))
+    yield cache
+    cache.clear()
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+    
+    def test_make_key_is_deterministic(self):
+        """Test that identical requests produce the same key."""
+        key_a = ResponseCache.make_key("model", "system", "user", 1500)
+        key_b = ResponseCache.make_key("model", "system", "user", 1500)
+        
+        assert key_a == key_b
+        assert len(key_a) == 64
+    
+    def test_make_key_depends_on_max_tokens(self):
+        """Test that max_tokens is part of the key."""
+        key_a = ResponseCache.make_key("model", "system", "user", 1500)
+        key_b = ResponseCache.make_key("model", "system", "user", 800)
+        
+        assert key_a != key_b
+    
+    def test_make_key_keeps_field_boundaries(self):
+        """Test that text moving between the user prompt and max_tokens changes the key."""
+        key_a = ResponseCache.make_key("model", "system", "user 1", 500)
+        key_b = ResponseCache.make_key("model", "system", "user ", 1500)
+        
+        assert key_a != key_b
+    
+    def test_miss_then_hit(self, response_cache):
+        """Test that a stored response is returned on the next lookup."""
+        key = ResponseCache.make_key("model", "system", "user", 1500)
+        
+        assert response_cache.get(key, "user") is None
+        
+        response_cache.set(key, "user", {"description": "Cached"})
+        
+        assert response_cache.get(key, "user") == {"description": "Cached"}
+    
+    def test_stats_counts_hits_and_misses(self, response_cache):
+        """Test that stats reports hit and miss counters."""
+        key = ResponseCache.make_key("model", "system", "user", 1500)
+        response_cache.get(key, "user")
+        response_cache.set(key, "user", [{"id": "q1"}])
+        response_cache.get(key, "user")
+        
+        stats = response_cache.stats()
+        
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["semantic_hits"] == 0
+        assert stats["size"] == 1
+
+
+class TestSemanticTier:
+    """Tests for the namespaced semantic tier (needs faiss-cpu and numpy)."""
+    
+    @pytest.fixture
+    def semantic_cache(self, tmp_path, monkeypatch):
+        """Provide a semantic cache whose embeddings are fixed vectors, not a model."""
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("faiss")
+        cache = ResponseCache(str(tmp_path / "llm_cache"), semantic=True, threshold=0.9)
+        # Every prompt embeds to the same unit vector, i.e. a perfect similarity match
+        monkeypatch.setattr(cache, "_embed", lambda text: np.ones((1, 4), dtype="float32") / 2)
+        yield cache
+        cache.clear()
+    
+    def test_similar_prompt_from_other_task_is_a_miss(self, semantic_cache):
+        """Test that a near-identical prompt only hits within its own task's namespace."""
+        # Same model, system prompt and max_tokens: only the task name differs
+        questions_ns = ResponseCache.make_namespace("model", "system", 2000, "questions")
+        comparison_ns = ResponseCache.make_namespace("model", "system", 2000, "comparison")
+        stored_key = ResponseCache.make_key("model", "system", "product + questions task", 2000)
+        semantic_cache.set(stored_key, "product + questions task", {"questions": []}, questions_ns)
+        
+        other_task_key = ResponseCache.make_key("model", "system", "product + comparison task", 2000)
+        assert semantic_cache.get(other_task_key, "product + comparison task", comparison_ns) is None
+        
+        same_task_key = ResponseCache.make_key("model", "system", "product + questions task!", 2000)
+        assert semantic_cache.get(same_task_key, "product + questions task!", questions_ns) == {"questions": []}
+        assert semantic_cache.stats()["semantic_hits"] == 1
+    
+    def test_indexes_survive_save_and_reload(self, semantic_cache, tmp_path, monkeypatch):
+        """Test that per-namespace indexes are persisted and restored."""
+        namespace = ResponseCache.make_namespace("model", "system", 3000)
+        key = ResponseCache.make_key("model", "system", "prompt", 3000)
+        semantic_cache.set(key, "prompt", {"n": 1}, namespace)
+        semantic_cache.save()
+        
+        reloaded = ResponseCache(str(tmp_path / "llm_cache"), semantic=True, threshold=0.9)
+        monkeypatch.setattr(reloaded, "_embed", semantic_cache._embed)
+        
+        assert reloaded.get("other-key", "prompt?", namespace) == {"n": 1}
+        assert reloaded.get("other-key", "prompt?", "other-namespace") is None
+
+
+class TestGenerateJsonCaching:
+    """Tests for how generate_json reads and writes the response cache."""
+    
+    @staticmethod
+    def _needs_ten(result):
+        if result["n"] < 10:
+            raise ValueError("n too small")
+    
+    def test_rejected_response_is_retried_and_not_cached(self, json_client):
+        """Test that a response failing validate is retried and only the accepted one is cached."""
+        client, queue = json_client
+        queue('{"n": 1}', '{"n": 20}')
+        
+        assert client.generate_json("system", "user", validate=self._needs_ten) == {"n": 20}
+        
+        key = ResponseCache.make_key("test-model", "system", "user", 2000)
+        assert client.cache.get(key, "user") == {"n": 20}
+        assert client.client.chat.completions.create.call_count == 2
+    
+    def test_validation_failure_is_not_logged_as_parse_error(self, json_client, capsys):
+        """Test that a rejected but well-formed response is reported as a validation failure."""
+        client, queue = json_client
+        queue('{"n": 1}', '{"n": 2}')
+        
+        with pytest.raises(ValueError, match="failed validation"):
+            client.generate_json("system", "user", max_retries=2, validate=self._needs_ten)
+        
+        output = capsys.readouterr().out
+        assert "Response rejected by validation (attempt 1/2): n too small" in output
+        assert "JSON parse error" not in output
+    
+    def test_cached_entry_failing_validate_is_a_miss(self, json_client):
+        """Test that a stored response the caller now rejects is fetched again."""
+        client, queue = json_client
+        key = ResponseCache.make_key("test-model", "system", "user", 2000)
+        client.cache.set(key, "user", {"n": 1})
+        queue('{"n": 30}')
+        
+        assert client.generate_json("system", "user", validate=self._needs_ten) == {"n": 30}
+        assert client.cache.get(key, "user") == {"n": 30}
+    
+    def test_use_cache_false_bypasses_cache(self, json_client):
+        """Test that use_cache=False neither reads nor writes the cache."""
+        client, queue = json_client
+        key = ResponseCache.make_key("test-model", "system", "user", 2000)
+        client.cache.set(key, "user", {"n": 1})
+        queue('{"n": 2}')
+        
+        assert client.generate_json("system", "user", use_cache=False) == {"n": 2}
+        assert client.cache.get(key, "user") == {"n": 1}
+    
+    def test_entries_expire(self, tmp_path):
+        """Test that the configured expiry is applied to stored entries."""
+        cache = ResponseCache(str(tmp_path / "llm_cache"), expire=60)
+        key = ResponseCache.make_key("model", "system", "user", 1500)
+        
+        cache.set(key, "user", {"n": 1})
+        
+        _, expire_time = cache._store.get(key, expire_time=True)
+        assert expire_time is not None
+        cache.clear()
+
+
+class TestJSONStreamScanner:
+    """Tests for JSONStreamScanner."""
+    
+    def test_detects_object_completion_across_chunks(self):
+        """Test that completion is reported only when the object closes."""
+        scanner = JSONStreamScanner()
+        
+        assert scanner.feed('{"description": "Bright') is False
+        assert scanner.feed('ening serum", "tags": ["a"') is False
+        assert scanner.feed(']}') is True
+    
+    def test_ignores_brackets_inside_strings(self):
+        """Test that brackets and escaped quotes in strings are not counted."""
+        scanner = JSONStreamScanner()
+        
+        assert scanner.feed('[{"text": "use } and ] \\" freely"') is False
+        assert scanner.feed('}]') is True
+    
+    def test_ignores_leading_prose(self):
+        """Test that text before the first bracket is skipped."""
+        scanner = JSONStreamScanner()
+        
+        assert scanner.feed('Here is the "JSON": ') is False
+        assert scanner.feed('{"a": 1}') is True
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+    
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst, then asks callers to wait."""
+        bucket = TokenBucket(interval=10, capacity=2)
+        
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(10, abs=0.5)
+        # The next caller queues behind the previous reservation
+        assert bucket.acquire() == pytest.approx(20, abs=0.5)
+    
+    def test_zero_interval_disables_limiting(self):
+        """Test that a non-positive interval never waits."""
+        bucket = TokenBucket(interval=0, capacity=1)
+        
+        assert all(bucket.acquire() == 0 for _ in range(5))
+    
+    def test_retry_after_header_is_read(self):
+        """Test that a 429's retry-after header is used when present."""
+        class FakeRateLimitError(Exception):
+            def __init__(self, headers):
+                super().__init__("429 rate limit")
+                self.response = type("Response", (), {"headers": headers})()
+        
+        assert _retry_after_seconds(FakeRateLimitError({"retry-after": "7"})) == 7.0
+        assert _retry_after_seconds(FakeRateLimitError({})) is None
+        assert _retry_after_seconds(ValueError("no response")) is None
+
+
+class TestRepairJson:
+    """Tests for the JSON repair fallback."""
+    
+    def test_repairs_fenced_response_with_prose(self):
+        """Test that fences, prose and raw newlines in strings are cleaned up."""
+        raw = 'Sure! Here it is:\n```json\n{"answer": "line one\nline two"}\n```'
+        
+        assert orjson.loads(_repair_json(raw)) == {"answer": "line one\nline two"}
+
+
+class TestStreaming:
+    """Tests for streamed generation with a stubbed Groq stream."""
+    
+    def test_generate_stream_yields_deltas_and_closes(self, streaming_client):
+        """Test that generate_stream yields every delta and closes the stream."""
+        client, stream = streaming_client
+        
+        assert list(client.generate_stream("system", "user")) == ['{"a": ', '1}', ' trailing prose']
+        stream.close.assert_called_once()
+    
+    def test_generate_streamed_stops_at_json_end(self, streaming_client):
+        """Test that generate_streamed returns once the JSON object closes."""
+        client, stream = streaming_client
+        
+        assert client.generate_streamed("system", "user") == '{"a": 1}'
+        stream.close.assert_called_once()
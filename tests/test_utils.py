@@ -0,0 +1,125 @@
+"""
+Tests for Utility Functions
+
+Unit tests for the file output helpers in the utils module.
+"""
+
+import os
+import shutil
+
+import orjson
+import pytest
+
+from src.utils import JSONLWriter, load_json, save_json, write_json_output, write_jsonl_output
+
+
+class TestJSONLWriter:
+    """Tests for JSONLWriter and JSON-lines output."""
+    
+    def test_writes_one_record_per_line(self, tmp_path):
+        """Test that records are buffered and flushed as compact lines on close."""
+        path = tmp_path / "pages.jsonl"
+        
+        with JSONLWriter(str(path)) as writer:
+            writer.write({"page_type": "faq"})
+            writer.write({"page_type": "product", "name": "Serum ₹699"})
+        
+        lines = path.read_bytes().splitlines()
+        assert [orjson.loads(line) for line in lines] == [
+            {"page_type": "faq"},
+            {"page_type": "product", "name": "Serum ₹699"}
+        ]
+    
+    def test_write_json_output_appends_in_jsonl_mode(self, tmp_path):
+        """Test that jsonl=True appends to the file instead of replacing it."""
+        output_dir = str(tmp_path / "out")
+        
+        write_json_output({"id": 1}, "pages.jsonl", output_dir, jsonl=True)
+        write_json_output({"id": 2}, "pages.jsonl", output_dir, jsonl=True)
+        
+        lines = (tmp_path / "out" / "pages.jsonl").read_bytes().splitlines()
+        assert [orjson.loads(line)["id"] for line in lines] == [1, 2]
+    
+    def test_write_jsonl_output_opens_file_once_per_batch(self, tmp_path, monkeypatch):
+        """Test that a batch of records shares one open file instead of one per record."""
+        opened = []
+        real_open = os.open
+        monkeypatch.setattr(os, "open", lambda *args: opened.append(args[0]) or real_open(*args))
+        
+        write_jsonl_output(({"id": i} for i in range(3)), "pages.jsonl", str(tmp_path))
+        
+        lines = (tmp_path / "pages.jsonl").read_bytes().splitlines()
+        assert [orjson.loads(line)["id"] for line in lines] == [0, 1, 2]
+        assert len(opened) == 1
+    
+    def test_write_json_output_writes_indented_utf8_with_newline(self, tmp_path):
+        """Test that the default mode writes indented UTF-8 JSON ending in a newline."""
+        write_json_output({"price": "₹699"}, "page.json", str(tmp_path))
+        
+        assert (tmp_path / "page.json").read_bytes() == '{\n  "price": "₹699"\n}\n'.encode("utf-8")
+    
+    def test_rejects_unserializable_record(self, tmp_path):
+        """Test that unserializable records raise ValueError."""
+        with JSONLWriter(str(tmp_path / "pages.jsonl")) as writer:
+            with pytest.raises(ValueError):
+                writer.write({"bad": object()})
+
+
+class TestSaveJson:
+    """Tests for save_json."""
+    
+    def test_saves_bare_filename_to_working_directory(self, tmp_path, monkeypatch):
+        """Test that a path without a directory part is written without makedirs."""
+        monkeypatch.chdir(tmp_path)
+        
+        save_json({"page_type": "faq"}, "faq.json")
+        
+        assert load_json(str(tmp_path / "faq.json")) == {"page_type": "faq"}
+    
+    def test_creates_missing_parent_directories(self, tmp_path):
+        """Test that nested output directories are created on first save."""
+        filepath = tmp_path / "a" / "b" / "faq.json"
+        
+        save_json({"page_type": "faq"}, str(filepath))
+        
+        assert load_json(str(filepath)) == {"page_type": "faq"}
+    
+    def test_non_finite_floats_and_non_str_keys(self, tmp_path):
+        """Test that the orjson path writes NaN/Infinity as null and stringifies keys."""
+        filepath = tmp_path / "scores.json"
+        
+        save_json({"nan": float("nan"), "inf": float("inf"), 1: "one"}, str(filepath))
+        
+        assert load_json(str(filepath)) == {"nan": None, "inf": None, "1": "one"}
+        assert b"NaN" not in filepath.read_bytes()
+    
+    def test_file_mode_follows_umask(self, tmp_path):
+        """Test that atomically written files get 0666 minus the current umask, like open()."""
+        previous = os.umask(0o027)
+        try:
+            save_json({"page_type": "faq"}, str(tmp_path / "faq.json"))
+        finally:
+            os.umask(previous)
+        
+        assert os.stat(tmp_path / "faq.json").st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["faq.json"]
+    
+    def test_recreates_directory_removed_after_first_save(self, tmp_path):
+        """Test that a cached output directory deleted mid-process is created again."""
+        output_dir = tmp_path / "out"
+        save_json({"run": 1}, str(output_dir / "faq.json"))
+        shutil.rmtree(output_dir)
+        
+        save_json({"run": 2}, str(output_dir / "faq.json"))
+        
+        assert load_json(str(output_dir / "faq.json")) == {"run": 2}
+        
+        shutil.rmtree(output_dir)
+        write_json_output({"run": 3}, "product.json", str(output_dir))
+        
+        assert load_json(str(output_dir / "product.json")) == {"run": 3}
+        
+        shutil.rmtree(output_dir)
+        write_json_output({"run": 4}, "pages.jsonl", str(output_dir), jsonl=True)
+        
+        assert orjson.loads((output_dir / "pages.jsonl").read_bytes()) == {"run": 4}